@@ -0,0 +1,183 @@
+import hashlib
+import os
+
+import numpy as np
+
+from content import DATA_DIR
+
+
+ADVISOR_VERSION = 1
+NO_ADVICE = 255
+
+
+def _monster_pmf(dice):
+    """Distribuição de dano do monstro indexada a partir de 0"""
+    pmf = np.zeros(dice.max_value + 1)
+    pmf[dice.min_value:] = dice.pmf
+    return pmf
+
+
+def monster_attack_pmfs(monster):
+    """Distribuição do contra-ataque para cada fase (turn_count % 3 antes do ataque)"""
+    normal = _monster_pmf(monster.dice)
+    special = _monster_pmf(monster.special_dice) if monster.is_boss else normal
+    # O ataque que leva turn_count a um múltiplo de 3 é o especial
+    return [special if (phase + 1) % 3 == 0 else normal for phase in range(3)]
+
+
+def definitions_key(weapons, monsters, max_hp):
+    """Hash das definições que influenciam a política (invalida o cache)"""
+    digest = hashlib.sha256(f"v{ADVISOR_VERSION}|{max_hp}".encode())
+    for w in weapons:
+        digest.update(f"W{w.min_damage}|".encode())
+        digest.update(np.asarray(w.pmf, dtype=float).tobytes())
+    for m in monsters:
+        digest.update(f"M{m.max_hp}|{m.is_boss}|".encode())
+        for pmf in monster_attack_pmfs(m):
+            digest.update(pmf.tobytes())
+    return digest.hexdigest()[:16]
+
+
+def solve(weapons, monsters, max_hp=100, tol=1e-12, max_sweeps=1000, average=False):
+    """Iteração de valor: melhor arma para cada estado
+
+    Estado = (sala, HP do jogador, HP do monstro, fase do turno do chefe).
+    O valor é a probabilidade de vencer a masmorra jogando de forma ótima.
+    Como o dano do jogador e do monstro reduz os HPs, cada nível de HP do
+    jogador depende só dos níveis abaixo; varremos do último monstro para o
+    primeiro e do menor HP para o maior, iterando até convergir quando há
+    autodependência (monstros que podem causar 0 de dano).
+
+    Com `average=True` os valores passam a ser os da arma sorteada
+    uniformemente (como no modo normal do jogo) - útil como referência exata.
+
+    Retorna (política uint8, valores float32), ambos com formato
+    (salas, max_hp + 1, maior HP de monstro + 1, 3).
+    """
+    rooms = len(monsters)
+    max_mhp = max(m.max_hp for m in monsters)
+    max_dmg = max(w.max_damage for w in weapons)
+    policy = np.full((rooms, max_hp + 1, max_mhp + 1, 3), NO_ADVICE, dtype=np.uint8)
+    values = np.zeros((rooms, max_hp + 1, max_mhp + 1, 3), dtype=np.float32)
+
+    # Valor de chegar à próxima sala com cada HP (após a última: vitória)
+    next_value = np.ones(max_hp + 1)
+    next_value[0] = 0.0
+
+    for room in range(rooms - 1, -1, -1):
+        monster = monsters[room]
+        hp = monster.max_hp
+        attack_pmfs = monster_attack_pmfs(monster)
+        W = np.zeros((max_hp + 1, hp + 1, 3))
+        best = np.zeros((max_hp + 1, hp + 1, 3), dtype=np.uint8)
+
+        for php in range(1, max_hp + 1):
+            for _ in range(max_sweeps):
+                previous = W[php].copy()
+                for phase in range(3):
+                    q = attack_pmfs[phase]
+                    after = (phase + 1) % 3
+                    # C[m'] = P(vencer) após o contra-ataque, com o monstro em m'
+                    C = np.zeros(hp + 1)
+                    for k in range(min(len(q), php)):
+                        if q[k]:
+                            C += q[k] * W[php - k, :, after]
+                    # E[j]: valor com o monstro em j - max_dmg (<= 0: sala vencida)
+                    E = np.full(hp + 1 + max_dmg, next_value[php])
+                    E[max_dmg + 1:] = C[1:]
+                    Q = np.empty((len(weapons), hp))
+                    for i, w in enumerate(weapons):
+                        conv = np.convolve(E, w.pmf)
+                        start = 1 - w.min_damage + max_dmg
+                        Q[i] = conv[start:start + hp]
+                    best[php, 1:, phase] = np.argmax(Q, axis=0)
+                    W[php, 1:, phase] = np.mean(Q, axis=0) if average else np.max(Q, axis=0)
+                if np.max(np.abs(W[php] - previous)) < tol:
+                    break
+
+        W[:, 0, :] = next_value[:, None]
+        policy[room, 1:, 1:hp + 1, :] = best[1:, 1:, :]
+        values[room, :, :hp + 1, :] = W
+        next_value = W[:, hp, 0].copy()
+        next_value[0] = 0.0
+
+    return policy, values
+
+
+class PolicyAdvisor:
+    """Conselheiro com a política ótima pré-calculada (consulta O(1))"""
+
+    def __init__(self, policy, values=None):
+        self.policy = policy
+        self.values = values
+
+    def best_weapon(self, room, player_hp, monster_hp, turn_count=0):
+        """Índice da melhor arma no estado, ou None se não houver combate"""
+        if not (0 <= room < self.policy.shape[0] and 0 < player_hp < self.policy.shape[1]
+                and 0 < monster_hp < self.policy.shape[2]):
+            return None
+        choice = int(self.policy[room, player_hp, monster_hp, turn_count % 3])
+        return None if choice == NO_ADVICE else choice
+
+    def win_probability(self, room, player_hp, monster_hp, turn_count=0):
+        """Probabilidade de vencer jogando de forma ótima a partir do estado"""
+        if self.values is None or not (0 <= room < self.values.shape[0] and 0 <= player_hp < self.values.shape[1]
+                                       and 0 <= monster_hp < self.values.shape[2]):
+            return None
+        return float(self.values[room, player_hp, monster_hp, turn_count % 3])
+
+    @classmethod
+    def load(cls, weapons, monsters, max_hp=100, directory=DATA_DIR):
+        """Carrega a política do cache (mmap, O(1)) ou a calcula e salva"""
+        key = definitions_key(weapons, monsters, max_hp)
+        policy_path = os.path.join(directory, f"policy-{key}.npy")
+        values_path = os.path.join(directory, f"policy-{key}-values.npy")
+        try:
+            return cls(np.load(policy_path, mmap_mode="r"), np.load(values_path, mmap_mode="r"))
+        except (OSError, ValueError):
+            pass
+
+        policy, values = solve(weapons, monsters, max_hp)
+        try:
+            for path, array in ((policy_path, policy), (values_path, values)):
+                tmp_path = path + ".tmp.npy"
+                np.save(tmp_path, array)
+                os.replace(tmp_path, path)
+        except OSError:
+            pass  # diretório somente leitura: segue sem cache
+        return cls(policy, values)
+
+
+if __name__ == "__main__":
+    import time
+    from monsters import MONSTERS
+    from session import GameSession
+    from weapons import WEAPONS
+
+    print("🧠 TESTANDO CONSELHEIRO (ITERAÇÃO DE VALOR)\n")
+
+    start = time.perf_counter()
+    policy, values = solve(WEAPONS, MONSTERS)
+    print(f"Politica calculada em {time.perf_counter() - start:.2f}s "
+          f"({policy.size} estados, {policy.nbytes / 1024:.0f} KB)")
+
+    advisor = PolicyAdvisor(policy, values)
+    print(f"Chance de vitoria (otima): {advisor.win_probability(0, 100, MONSTERS[0].max_hp):.4f}")
+
+    # Confere por simulação: política ótima vs arma aleatória
+    games = 20_000
+    for label, use_advisor in (("Conselheiro", True), ("Aleatorio", False)):
+        wins = 0
+        for seed in range(games):
+            session = GameSession(seed=seed, history_limit=1)
+            while not session.is_finished():
+                weapon = None
+                if use_advisor:
+                    m = session.current_monster
+                    weapon = advisor.best_weapon(session.current_room, session.player_hp,
+                                                 m.current_hp, m.turn_count)
+                session.attack(weapon)
+            wins += session.victory
+        print(f"  {label:<12} vitorias: {wins / games:.4f}")
+
+    print("\n✅ Módulo funcionando corretamente!")
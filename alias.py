@@ -0,0 +1,86 @@
+import random
+
+import numpy as np
+
+
+class AliasTable:
+    """Amostrador pelo método Alias (Walker/Vose)
+
+    Depois de montar a tabela em O(n), cada sorteio custa O(1): escolhe-se
+    uma coluna uniformemente e, com uma única comparação, fica-se com o
+    valor da coluna ou com o seu "alias".
+    """
+
+    def __init__(self, pmf, offset=0):
+        pmf = np.asarray(pmf, dtype=float)
+        n = len(pmf)
+        scaled = pmf * (n / pmf.sum())
+
+        prob = np.ones(n)
+        alias = np.arange(n)
+        small = [i for i in range(n) if scaled[i] < 1.0]
+        large = [i for i in range(n) if scaled[i] >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] = (scaled[l] + scaled[s]) - 1.0
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Sobras (erro de arredondamento) ficam com probabilidade 1
+
+        self.offset = offset
+        self.size = n
+        self.prob = prob
+        self.alias = alias
+        self._prob_list = prob.tolist()
+        self._alias_list = alias.tolist()
+
+    def sample(self, rng=random):
+        """Sorteia um valor usando um único número aleatório"""
+        x = rng.random() * self.size
+        column = int(x)
+        if x - column < self._prob_list[column]:
+            return self.offset + column
+        return self.offset + self._alias_list[column]
+
+    def sample_many(self, size, rng=None):
+        """Sorteia `size` valores de forma vetorizada"""
+        if rng is None:
+            rng = np.random.default_rng()
+        x = rng.random(size) * self.size
+        columns = x.astype(np.int64)
+        keep = (x - columns) < self.prob[columns]
+        return self.offset + np.where(keep, columns, self.alias[columns])
+
+
+if __name__ == "__main__":
+    from weapons import WEAPONS
+
+    print("🎯 TESTANDO AMOSTRADOR ALIAS\n")
+
+    n = 200_000
+    rng = np.random.default_rng(2024)
+    py_rng = random.Random(2024)
+    for weapon in WEAPONS:
+        table = weapon.alias_table
+        bins = len(weapon.pmf)
+
+        batch = table.sample_many(n, rng) - weapon.min_damage
+        single = [weapon.roll(py_rng)[0] - weapon.min_damage for _ in range(n)]
+        reference = weapon.dice.sample(n, rng) - weapon.min_damage
+
+        expected = weapon.pmf * n
+        stats = [float(np.sum((np.bincount(s, minlength=bins) - expected) ** 2 / expected))
+                 for s in (batch, single, reference)]
+
+        # Wilson-Hilferty: z ~ N(0, 1) se a estatística segue qui-quadrado
+        df = bins - 1
+        z = [((s / df) ** (1 / 3) - (1 - 2 / (9 * df))) / np.sqrt(2 / (9 * df)) for s in stats]
+        status = "OK" if max(z) < 4 else "FALHOU"
+        print(f"{weapon.name:<20} {weapon.dice_notation:<8} chi2 lote={stats[0]:8.1f} "
+              f"roll={stats[1]:8.1f} CDF={stats[2]:8.1f} (gl={df}) {status}")
+        assert max(z) < 4, weapon.name
+
+    print("\n✅ Módulo funcionando corretamente!")
@@ -0,0 +1,125 @@
+import hashlib
+import json
+import os
+import zipfile
+
+import numpy as np
+
+from dice import CompiledDice, compile_expression
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11
+    tomllib = None
+
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+WEAPONS_FILE = os.path.join(DATA_DIR, "weapons.json")
+MONSTERS_FILE = os.path.join(DATA_DIR, "monsters.json")
+
+CACHE_SUFFIX = ".cache"
+CACHE_VERSION = 3
+
+
+def compile_dice(notation):
+    """Pré-calcula os dados derivados de uma expressão de dados
+
+    O dano nunca é negativo: a massa de probabilidade abaixo de zero
+    (ex.: "1d4-2") é acumulada no zero.
+    """
+    dice = compile_expression(notation)
+    offset, pmf = dice.offset, dice.pmf
+    if offset < 0:
+        cut = -offset
+        pmf = np.concatenate(([pmf[:cut + 1].sum()], pmf[cut + 1:]))
+        offset = 0
+        dice = CompiledDice(dice.expression, offset, pmf, dice.num_dice, dice.sides)
+    return {
+        "expression": dice.expression,
+        "num_dice": dice.num_dice,
+        "sides": dice.sides,
+        "min": dice.min_value,
+        "max": dice.max_value,
+        "avg": dice.mean,
+        "variance": dice.variance,
+        "pmf": dice.pmf,
+        "crit_prob": float(dice.pmf[-1]),
+    }
+
+
+def build_dice(compiled):
+    """Reconstrói o amostrador a partir dos dados pré-calculados (sem reanalisar)"""
+    return CompiledDice(compiled["expression"], compiled["min"], compiled["pmf"],
+                        compiled["num_dice"], compiled["sides"])
+
+
+def read_definitions(path):
+    """Lê um arquivo de definições em JSON ou TOML"""
+    if path.endswith(".toml"):
+        if tomllib is None:
+            raise RuntimeError("Arquivos TOML exigem Python 3.11+")
+        with open(path, "rb") as f:
+            return tomllib.load(f)
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def file_hash(path):
+    """Retorna o hash SHA-256 do arquivo de origem"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 16), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _read_cache(cache_path, digest):
+    """Entradas do cache `.npz` (cabeçalho JSON + PMFs), ou None se inválido
+
+    Nada é desserializado com pickle: o cache fica ao lado de arquivos de
+    dados que os usuários trocam entre si.
+    """
+    try:
+        with np.load(cache_path, allow_pickle=False) as data:
+            header = json.loads(str(data["header"]))
+            if header.get("version") != CACHE_VERSION or header.get("hash") != digest:
+                return None
+            entries = header["entries"]
+            for i, entry in enumerate(entries):
+                entry["pmf"] = data[f"pmf_{i}"]
+            return entries
+    except (OSError, ValueError, KeyError, TypeError, zipfile.BadZipFile):
+        return None
+
+
+def _write_cache(cache_path, digest, entries):
+    header = {"version": CACHE_VERSION, "hash": digest,
+              "entries": [{k: v for k, v in entry.items() if k != "pmf"} for entry in entries]}
+    pmfs = {f"pmf_{i}": np.asarray(entry["pmf"], dtype=float) for i, entry in enumerate(entries)}
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, header=np.array(json.dumps(header, default=lambda v: v.item())), **pmfs)
+    os.replace(tmp_path, cache_path)
+
+
+def load_compiled(path, key, compile_entry):
+    """Carrega as entradas `key` do arquivo, usando o cache binário se válido
+
+    O cache fica ao lado do arquivo de origem (`<arquivo>.cache`, formato
+    `.npz` lido sem pickle) e só é reutilizado enquanto o hash do arquivo de
+    origem não mudar.
+    """
+    digest = file_hash(path)
+    cache_path = path + CACHE_SUFFIX
+
+    entries = _read_cache(cache_path, digest)
+    if entries is not None:
+        return entries
+
+    entries = [compile_entry(raw) for raw in read_definitions(path).get(key, [])]
+    try:
+        _write_cache(cache_path, digest, entries)
+    except OSError:
+        pass  # diretório somente leitura: segue sem cache
+
+    return entries
@@ -0,0 +1,185 @@
+import numpy as np
+
+
+class MinMaxDecimator:
+    """Série decimada em baldes de mínimo/máximo, mantida de forma incremental
+
+    Cada balde cobre `bucket_size` pontos consecutivos e guarda o menor e o
+    maior valor (com suas posições); ao desenhar, cada balde vira até dois
+    pontos, o que preserva picos e vales. Quando os baldes passam de
+    `max_points / 2`, pares vizinhos são fundidos e `bucket_size` dobra - o
+    custo de `append` é O(1) amortizado e o número de pontos desenhados fica
+    limitado por `max_points`, não importa quantos ataques a sessão tenha.
+    """
+
+    def __init__(self, max_points=1400):
+        self.max_buckets = max(1, max_points // 2)
+        capacity = self.max_buckets + 1
+        self.min_x = np.zeros(capacity, dtype=np.int64)
+        self.min_y = np.zeros(capacity)
+        self.max_x = np.zeros(capacity, dtype=np.int64)
+        self.max_y = np.zeros(capacity)
+        self.reset()
+
+    def reset(self):
+        self.bucket_size = 1
+        self.buckets = 0
+        self.fill = 0  # pontos no último balde
+        self.n = 0
+
+    def append(self, y):
+        x = self.n + 1  # eixo "Ataque #" começa em 1
+        self.n += 1
+        if self.buckets and self.fill == self.bucket_size and self.buckets == self.max_buckets:
+            self._halve()  # com número ímpar de baldes, o último volta a ter espaço
+        if self.buckets == 0 or self.fill == self.bucket_size:
+            b = self.buckets
+            self.min_x[b] = self.max_x[b] = x
+            self.min_y[b] = self.max_y[b] = y
+            self.buckets += 1
+            self.fill = 1
+            return
+        b = self.buckets - 1
+        if y < self.min_y[b]:
+            self.min_x[b], self.min_y[b] = x, y
+        if y > self.max_y[b]:
+            self.max_x[b], self.max_y[b] = x, y
+        self.fill += 1
+
+    def extend(self, values):
+        for y in values:
+            self.append(y)
+
+    def extend_many(self, values):
+        """Acrescenta um lote inteiro de forma vetorizada (mesmo resultado de `extend`)"""
+        values = np.asarray(values, dtype=float)
+        pos = 0
+        while pos < len(values):
+            if self.buckets and self.fill < self.bucket_size:
+                # Completa o último balde
+                take = min(self.bucket_size - self.fill, len(values) - pos)
+                chunk = values[pos:pos + take]
+                b = self.buckets - 1
+                lo, hi = int(chunk.argmin()), int(chunk.argmax())
+                if chunk[lo] < self.min_y[b]:
+                    self.min_x[b], self.min_y[b] = self.n + 1 + lo, chunk[lo]
+                if chunk[hi] > self.max_y[b]:
+                    self.max_x[b], self.max_y[b] = self.n + 1 + hi, chunk[hi]
+                self.fill += take
+            elif self.buckets == self.max_buckets:
+                self._halve()
+                continue
+            else:
+                # Baldes novos, inteiros, até o limite de baldes
+                take = min(len(values) - pos, (self.max_buckets - self.buckets) * self.bucket_size)
+                self._new_buckets(values[pos:pos + take])
+            self.n += take
+            pos += take
+
+    def _new_buckets(self, chunk):
+        """Abre baldes a partir de `chunk` (mínimo/máximo por balde via reshape)"""
+        size = self.bucket_size
+        count = -(-len(chunk) // size)
+        padded_min = np.full(count * size, np.inf)
+        padded_max = np.full(count * size, -np.inf)
+        padded_min[:len(chunk)] = padded_max[:len(chunk)] = chunk
+        starts = np.arange(count) * size
+        lo = starts + padded_min.reshape(count, size).argmin(axis=1)
+        hi = starts + padded_max.reshape(count, size).argmax(axis=1)
+        b = slice(self.buckets, self.buckets + count)
+        self.min_x[b], self.min_y[b] = self.n + 1 + lo, chunk[lo]
+        self.max_x[b], self.max_y[b] = self.n + 1 + hi, chunk[hi]
+        self.buckets += count
+        self.fill = len(chunk) - (count - 1) * size
+
+    def assign(self, values):
+        """Substitui a série por `values` de uma vez (vetorizado)
+
+        Produz os mesmos baldes que `extend` a partir do zero: o menor
+        tamanho potência de 2 que cabe em `max_buckets`, com o primeiro
+        mínimo/máximo de cada balde.
+        """
+        values = np.asarray(values, dtype=float)
+        self.reset()
+        while len(values) > self.max_buckets * self.bucket_size:
+            self.bucket_size *= 2
+        if len(values):
+            self._new_buckets(values)
+            self.n = len(values)
+
+    def _halve(self):
+        """Funde pares de baldes vizinhos (o tamanho dos baldes dobra)"""
+        pairs = self.buckets // 2
+        left, right = slice(0, 2 * pairs, 2), slice(1, 2 * pairs, 2)
+        take_right = self.min_y[right] < self.min_y[left]
+        self.min_x[:pairs] = np.where(take_right, self.min_x[right], self.min_x[left])
+        self.min_y[:pairs] = np.where(take_right, self.min_y[right], self.min_y[left])
+        take_right = self.max_y[right] > self.max_y[left]
+        self.max_x[:pairs] = np.where(take_right, self.max_x[right], self.max_x[left])
+        self.max_y[:pairs] = np.where(take_right, self.max_y[right], self.max_y[left])
+        if self.buckets % 2:
+            # Balde ímpar no fim: passa a ser o último (incompleto) do novo tamanho
+            last = self.buckets - 1
+            self.min_x[pairs], self.min_y[pairs] = self.min_x[last], self.min_y[last]
+            self.max_x[pairs], self.max_y[pairs] = self.max_x[last], self.max_y[last]
+            self.buckets = pairs + 1
+        else:
+            self.buckets = pairs
+            self.fill = 2 * self.bucket_size
+        self.bucket_size *= 2
+
+    def points(self):
+        """(xs, ys) para desenhar: mínimo e máximo de cada balde, em ordem de x"""
+        b = self.buckets
+        first_x = np.minimum(self.min_x[:b], self.max_x[:b])
+        second_x = np.maximum(self.min_x[:b], self.max_x[:b])
+        min_first = self.min_x[:b] <= self.max_x[:b]
+        first_y = np.where(min_first, self.min_y[:b], self.max_y[:b])
+        second_y = np.where(min_first, self.max_y[:b], self.min_y[:b])
+        xs = np.column_stack((first_x, second_x)).ravel()
+        ys = np.column_stack((first_y, second_y)).ravel()
+        # Balde de um só ponto (ou com mínimo == máximo na mesma posição)
+        keep = np.ones(len(xs), dtype=bool)
+        keep[1::2] = second_x != first_x
+        return xs[keep], ys[keep]
+
+
+if __name__ == "__main__":
+    import time
+
+    print("📉 TESTANDO DECIMAÇÃO MIN/MAX\n")
+
+    rng = np.random.default_rng(7)
+    for n, max_points in ((10, 1400), (1_000, 1400), (100_000, 1400), (5_000, 38)):
+        values = rng.integers(1, 21, size=n).astype(float)
+        decimator = MinMaxDecimator(max_points=max_points)
+        start = time.perf_counter()
+        decimator.extend(values)
+        elapsed = time.perf_counter() - start
+        xs, ys = decimator.points()
+
+        # Confere: todos os pontos existem na série, extremos preservados
+        assert len(xs) <= max_points
+        assert np.all(np.diff(xs) > 0)
+        assert np.array_equal(values[xs - 1], ys)
+        assert ys.min() == values.min() and ys.max() == values.max()
+        # Cada balde tem o mínimo/máximo exatos do seu trecho
+        size = decimator.bucket_size
+        assert decimator.buckets == -(-n // size)
+        for b in range(decimator.buckets):
+            chunk = values[b * size:(b + 1) * size]
+            assert decimator.min_y[b] == chunk.min() and decimator.max_y[b] == chunk.max()
+        # Carga vetorizada (de uma vez ou em lotes): mesmos baldes que a incremental
+        bulk = MinMaxDecimator(max_points=max_points)
+        bulk.assign(values)
+        assert all(np.array_equal(a, b) for a, b in zip(bulk.points(), (xs, ys)))
+        batched = MinMaxDecimator(max_points=max_points)
+        start = time.perf_counter()
+        for chunk in np.array_split(values, max(1, n // 2000)):
+            batched.extend_many(chunk)
+        batched_elapsed = time.perf_counter() - start
+        assert all(np.array_equal(a, b) for a, b in zip(batched.points(), (xs, ys)))
+        print(f"  {n:>7} ataques -> {len(xs):>4} pontos (baldes de {size}), "
+              f"{elapsed / n * 1e6:.2f} us por ataque ({batched_elapsed / n * 1e6:.3f} us em lotes)")
+
+    print("\n✅ Módulo funcionando corretamente!")
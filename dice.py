@@ -0,0 +1,351 @@
+import random
+import re
+from bisect import bisect_right
+from functools import lru_cache
+from math import comb
+
+import numpy as np
+
+
+# Limite de explosões por dado: mantém a distribuição finita (e exata)
+MAX_EXPLOSIONS = 3
+
+_TOKEN = re.compile(r"(?:(\d*)d(\d+)((?:kh\d+|kl\d+|k\d+|r\d+|!)*)|(\d+)|(adv|dis)|([+\-()]))",
+                    re.IGNORECASE)
+_MODIFIER = re.compile(r"kh\d+|kl\d+|k\d+|r\d+|!", re.IGNORECASE)
+
+
+class DiceTerm:
+    """Termo NdS com modificadores (manter maiores/menores, rerrolar, explodir)"""
+
+    def __init__(self, num_dice, sides, keep=None, keep_highest=True, reroll=0, explode=False):
+        if num_dice < 1 or sides < 1:
+            raise ValueError("Quantidade de dados e lados devem ser positivos")
+        if keep is not None and not 1 <= keep <= num_dice:
+            raise ValueError(f"Nao e possivel manter {keep} de {num_dice} dados")
+        if reroll >= sides:
+            raise ValueError(f"Rerrolagem r{reroll} invalida para d{sides}")
+        if explode and sides == 1:
+            raise ValueError("Dados de 1 lado nao podem explodir")
+        self.num_dice = num_dice
+        self.sides = sides
+        self.keep = None if keep == num_dice else keep
+        self.keep_highest = keep_highest
+        self.reroll = reroll
+        self.explode = explode
+
+    def canonical(self):
+        text = f"{self.num_dice}d{self.sides}"
+        if self.reroll:
+            text += f"r{self.reroll}"
+        if self.explode:
+            text += "!"
+        if self.keep is not None:
+            text += f"{'kh' if self.keep_highest else 'kl'}{self.keep}"
+        return text
+
+    def die_pmf(self):
+        """Distribuição de um único dado (offset, probabilidades)"""
+        sides = self.sides
+        pmf = np.full(sides, 1.0 / sides)
+        if self.reroll:
+            # Rerrola uma única vez os valores <= reroll
+            low = self.reroll / sides
+            pmf = np.full(sides, low / sides)
+            pmf[self.reroll:] += 1.0 / sides
+        if self.explode:
+            base = pmf
+            pmf = base.copy()
+            for _ in range(MAX_EXPLOSIONS):
+                exploded = np.zeros(len(pmf) + sides)
+                exploded[:sides - 1] = base[:sides - 1]
+                exploded[sides:] = base[-1] * pmf
+                pmf = exploded
+        return 1, pmf
+
+    def pmf(self):
+        offset, die = self.die_pmf()
+        if self.keep is None:
+            total = np.ones(1)
+            for _ in range(self.num_dice):
+                total = np.convolve(total, die)
+            return offset * self.num_dice, total
+        return _keep_pmf(offset, die, self.num_dice, self.keep, self.keep_highest)
+
+
+def _keep_pmf(offset, die, num_dice, keep, keep_highest):
+    """Distribuição exata da soma dos `keep` maiores (ou menores) de N dados
+
+    Percorre as faces em ordem (da maior para a menor, ou vice-versa),
+    decidindo quantos dados caem em cada face; os primeiros `keep` dados
+    atribuídos são os mantidos.
+    """
+    faces = range(len(die) - 1, -1, -1) if keep_highest else range(len(die))
+    states = {(0, 0): 1.0}  # (dados atribuídos, soma mantida) -> probabilidade
+    for face in faces:
+        p = die[face]
+        if p == 0.0:
+            continue
+        value = face + offset
+        nxt = {}
+        for (assigned, kept_sum), prob in states.items():
+            remaining = num_dice - assigned
+            for count in range(remaining + 1):
+                weight = prob * comb(remaining, count) * p ** count
+                kept = max(0, min(count, keep - assigned))
+                key = (assigned + count, kept_sum + kept * value)
+                nxt[key] = nxt.get(key, 0.0) + weight
+        states = nxt
+
+    sums = {s: prob for (assigned, s), prob in states.items() if assigned == num_dice}
+    low = min(sums)
+    pmf = np.zeros(max(sums) - low + 1)
+    for s, prob in sums.items():
+        pmf[s - low] += prob
+    return low, pmf
+
+
+class _Parser:
+    """Analisador descendente recursivo para expressões de dados"""
+
+    def __init__(self, text):
+        self.text = text
+        self.tokens = self._tokenize(text)
+        self.pos = 0
+
+    def _tokenize(self, text):
+        text = "".join(text.split())
+        tokens = []
+        pos = 0
+        while pos < len(text):
+            match = _TOKEN.match(text, pos)
+            if not match or match.end() == pos:
+                raise ValueError(f"Expressao de dados invalida: {self.text!r}")
+            tokens.append(match)
+            pos = match.end()
+        return tokens
+
+    def peek(self):
+        return self.tokens[self.pos] if self.pos < len(self.tokens) else None
+
+    def symbol(self):
+        token = self.peek()
+        return token.group(6) if token is not None else None
+
+    def expect(self, symbol):
+        if self.symbol() != symbol:
+            raise ValueError(f"Esperado {symbol!r} em {self.text!r}")
+        self.pos += 1
+
+    def parse(self):
+        node = self.expression()
+        if self.peek() is not None:
+            raise ValueError(f"Expressao de dados invalida: {self.text!r}")
+        return node
+
+    def expression(self):
+        terms = [(1, self.term())]
+        while self.symbol() in ("+", "-"):
+            sign = 1 if self.symbol() == "+" else -1
+            self.pos += 1
+            terms.append((sign, self.term()))
+        return terms[0][1] if len(terms) == 1 and terms[0][0] == 1 else ("sum", terms)
+
+    def term(self):
+        token = self.peek()
+        if token is None:
+            raise ValueError(f"Expressao de dados incompleta: {self.text!r}")
+        self.pos += 1
+
+        if token.group(2):
+            return self._dice(token)
+        if token.group(4):
+            return ("const", int(token.group(4)))
+        if token.group(5):
+            mode = token.group(5).lower()
+            self.expect("(")
+            inner = self.expression()
+            self.expect(")")
+            return (mode, inner)
+        if token.group(6) == "(":
+            inner = self.expression()
+            self.expect(")")
+            return inner
+        raise ValueError(f"Expressao de dados invalida: {self.text!r}")
+
+    def _dice(self, token):
+        num_dice = int(token.group(1)) if token.group(1) else 1
+        options = {}
+        seen = set()
+        for mod in _MODIFIER.findall(token.group(3) or ""):
+            mod = mod.lower()
+            kind = mod[0]  # "k" (kh/kl/k), "r" ou "!"
+            if kind in seen:
+                raise ValueError(f"Modificador repetido ou conflitante em {self.text!r}")
+            seen.add(kind)
+            if mod == "!":
+                options["explode"] = True
+            elif mod.startswith("r"):
+                options["reroll"] = int(mod[1:])
+            else:
+                options["keep_highest"] = not mod.startswith("kl")
+                options["keep"] = int(mod.lstrip("khl"))
+        return ("dice", DiceTerm(num_dice, int(token.group(2)), **options))
+
+
+def _canonical(node):
+    kind = node[0]
+    if kind == "dice":
+        return node[1].canonical()
+    if kind == "const":
+        return str(node[1])
+    if kind in ("adv", "dis"):
+        return f"{kind}({_canonical(node[1])})"
+    parts = []
+    for i, (sign, child) in enumerate(node[1]):
+        text = _canonical(child)
+        if child[0] == "sum":
+            text = f"({text})"
+        if i == 0:
+            parts.append(text if sign > 0 else f"-{text}")
+        else:
+            parts.append(f"{'+' if sign > 0 else '-'}{text}")
+    return "".join(parts)
+
+
+def _node_pmf(node):
+    """Distribuição exata de um nó (offset, probabilidades)"""
+    kind = node[0]
+    if kind == "dice":
+        return node[1].pmf()
+    if kind == "const":
+        return node[1], np.ones(1)
+    if kind in ("adv", "dis"):
+        offset, pmf = _node_pmf(node[1])
+        cdf = np.cumsum(pmf)
+        if kind == "adv":
+            cdf2 = cdf ** 2
+        else:
+            cdf2 = 1.0 - (1.0 - cdf) ** 2
+        return offset, np.diff(cdf2, prepend=0.0)
+    offset, pmf = 0, np.ones(1)
+    for sign, child in node[1]:
+        child_offset, child_pmf = _node_pmf(child)
+        if sign < 0:
+            child_offset = -(child_offset + len(child_pmf) - 1)
+            child_pmf = child_pmf[::-1]
+        offset += child_offset
+        pmf = np.convolve(pmf, child_pmf)
+    return offset, pmf
+
+
+def _primary_dice(node):
+    """Primeiro termo de dados da expressão (para exibição de NdS)"""
+    if node[0] == "dice":
+        return node[1]
+    if node[0] in ("adv", "dis"):
+        return _primary_dice(node[1])
+    if node[0] == "sum":
+        for _, child in node[1]:
+            term = _primary_dice(child)
+            if term is not None:
+                return term
+    return None
+
+
+class CompiledDice:
+    """Expressão de dados compilada: distribuição exata + amostrador rápido
+
+    Cada rolagem custa um único número aleatório (inversão da CDF),
+    independentemente de quantos dados ou modificadores a expressão tenha.
+    """
+
+    def __init__(self, expression, offset, pmf, num_dice=None, sides=None):
+        pmf = np.asarray(pmf, dtype=float)
+        nonzero = np.nonzero(pmf > 0)[0]
+        pmf = pmf[nonzero[0]:nonzero[-1] + 1]
+        offset += int(nonzero[0])
+        pmf = pmf / pmf.sum()
+
+        self.expression = expression
+        self.offset = offset
+        self.pmf = pmf
+        self.num_dice = num_dice
+        self.sides = sides
+
+        values = np.arange(offset, offset + len(pmf))
+        self.min_value = offset
+        self.max_value = offset + len(pmf) - 1
+        self.mean = float(np.dot(values, pmf))
+        self.variance = float(np.dot((values - self.mean) ** 2, pmf))
+
+        self.cdf = np.cumsum(pmf)
+        self.cdf[-1] = 1.0
+        self._cdf_list = self.cdf.tolist()
+
+    def roll(self, rng=random):
+        """Rola a expressão uma vez"""
+        return self.offset + bisect_right(self._cdf_list, rng.random())
+
+    def sample(self, size, rng=None):
+        """Rola a expressão `size` vezes de forma vetorizada"""
+        if rng is None:
+            rng = np.random.default_rng()
+        return self.offset + np.searchsorted(self.cdf, rng.random(size), side="right")
+
+    def probabilities(self):
+        """Retorna {valor: probabilidade}"""
+        return {self.offset + i: float(p) for i, p in enumerate(self.pmf)}
+
+    def __repr__(self):
+        return f"CompiledDice({self.expression!r})"
+
+
+def canonical_expression(text):
+    """Forma canônica de uma expressão (ex.: " 2D20KH1 + 3" -> "2d20kh1+3")"""
+    return _canonical(_Parser(text).parse())
+
+
+@lru_cache(maxsize=None)
+def _compile_canonical(canonical):
+    node = _Parser(canonical).parse()
+    offset, pmf = _node_pmf(node)
+    primary = _primary_dice(node)
+    return CompiledDice(canonical, offset, pmf,
+                        num_dice=primary.num_dice if primary else None,
+                        sides=primary.sides if primary else None)
+
+
+def compile_expression(text):
+    """Compila uma expressão de dados (com cache pela forma canônica)
+
+    Sintaxe suportada:
+        NdS         soma de N dados de S lados (N opcional: "d20")
+        +M / -M     modificadores constantes, somas e subtrações de termos
+        khK / klK   mantém os K maiores / menores dados ("4d6kh3")
+        rR          rerrola uma vez valores <= R ("2d6r1")
+        !           dados explodem no valor máximo ("3d6!")
+        adv(...)    vantagem: rola duas vezes e fica com o maior
+        dis(...)    desvantagem: rola duas vezes e fica com o menor
+    """
+    return _compile_canonical(canonical_expression(text))
+
+
+if __name__ == "__main__":
+    print("🎲 TESTANDO MÓDULO DE DADOS\n")
+
+    for text in ["3d4", "1d8+2", "4d6kh3", "2d6r1", "2d6!", "adv(1d20)", "dis(1d20)+5", "2d10-1d4"]:
+        dice = compile_expression(text)
+        samples = dice.sample(200_000, np.random.default_rng(42))
+        print(f"{dice.expression:<14} min={dice.min_value:<3} max={dice.max_value:<4} "
+              f"media={dice.mean:6.3f} (amostral {samples.mean():6.3f}) "
+              f"var={dice.variance:7.3f} (amostral {samples.var():7.3f})")
+
+    assert compile_expression("4D6 KH3") is compile_expression("4d6kh3")
+    for text in ["4d6kh3kl1", "2d6r1r2", "3d6!!"]:
+        try:
+            compile_expression(text)
+        except ValueError:
+            continue
+        raise AssertionError(f"{text} deveria ser rejeitada")
+    print("\n✅ Módulo funcionando corretamente!")
@@ -0,0 +1,161 @@
+import csv
+from collections import namedtuple
+
+import numpy as np
+
+
+# Colunas de um evento de ataque (monster_damage = -1: o monstro morreu e
+# não contra-atacou)
+ATTACK_FIELDS = ("weapon", "damage", "critical", "monster_damage", "special", "room", "player_hp")
+
+RoomEvent = namedtuple("RoomEvent", "kind room attack")
+RoomEvent.__doc__ = """Evento de sala: kind é "enter", "clear", "victory" ou "death"
+
+`attack` é quantos ataques já tinham sido publicados no momento do evento,
+o que permite intercalá-lo com os ataques do mesmo lote.
+"""
+
+
+class AttackBatch:
+    """Lote de ataques em formato de colunas (um array NumPy por campo)"""
+
+    def __init__(self, rows):
+        columns = np.array(rows, dtype=np.int64).reshape(-1, len(ATTACK_FIELDS)).T
+        for name, column in zip(ATTACK_FIELDS, columns):
+            setattr(self, name, column)
+        self.critical = self.critical.astype(bool)
+        self.special = self.special.astype(bool)
+
+    def __len__(self):
+        return len(self.damage)
+
+    def rows(self):
+        return np.column_stack([getattr(self, name) for name in ATTACK_FIELDS])
+
+
+class EventBus:
+    """Fila de eventos de ataque e de sala com entrega em lotes
+
+    Publicar é só acrescentar uma linha a uma lista; `flush()` (uma vez por
+    quadro, ou antes de ler estatísticas) converte os ataques pendentes em um
+    único `AttackBatch` e entrega o lote e os eventos de sala a cada
+    assinante. Com milhares de ataques por quadro no modo turbo, cada
+    assinante é chamado uma vez e trabalha de forma vetorizada. Acima de
+    `max_pending` ataques o lote é entregue na hora, para que uma sessão que
+    nunca chama `flush()` não acumule eventos sem limite.
+    """
+
+    def __init__(self, max_pending=4096):
+        self.max_pending = max_pending
+        self.pending_attacks = []
+        self.pending_rooms = []
+        self.published = 0
+        self.subscribers = []
+
+    def subscribe(self, on_attacks=None, on_rooms=None):
+        """Registra callbacks `on_attacks(batch)` e/ou `on_rooms(events)`"""
+        subscriber = (on_attacks, on_rooms)
+        self.subscribers.append(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber):
+        if subscriber in self.subscribers:
+            self.subscribers.remove(subscriber)
+
+    def attack(self, *row):
+        self.pending_attacks.append(row)
+        self.published += 1
+        if len(self.pending_attacks) >= self.max_pending:
+            self.flush()
+
+    def room(self, kind, room):
+        self.pending_rooms.append(RoomEvent(kind, room, self.published))
+
+    def flush(self):
+        """Entrega os eventos pendentes; retorna quantos ataques havia"""
+        if not self.pending_attacks and not self.pending_rooms:
+            return 0
+        batch = AttackBatch(self.pending_attacks) if self.pending_attacks else None
+        rooms, self.pending_rooms = self.pending_rooms, []
+        self.pending_attacks = []
+        for on_attacks, on_rooms in self.subscribers:
+            if batch is not None and on_attacks is not None:
+                on_attacks(batch)
+            if rooms and on_rooms is not None:
+                on_rooms(rooms)
+        return 0 if batch is None else len(batch)
+
+
+class EventLogger:
+    """Assinante que registra os eventos de sala e um resumo de cada lote"""
+
+    def __init__(self, bus, log=print):
+        self.log = log
+        self.subscription = bus.subscribe(self.on_attacks, self.on_rooms)
+
+    def on_attacks(self, batch):
+        self.log(f"[eventos] {len(batch)} ataques, dano medio {batch.damage.mean():.2f}, "
+                 f"{int(batch.critical.sum())} criticos")
+
+    def on_rooms(self, events):
+        for event in events:
+            self.log(f"[eventos] ataque #{event.attack}: {event.kind} (sala {event.room + 1})")
+
+
+class CsvExporter:
+    """Assinante que grava todos os ataques em CSV (um `writerows` por lote)"""
+
+    def __init__(self, bus, path):
+        self.file = open(path, "w", newline="")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(ATTACK_FIELDS)
+        self.subscription = bus.subscribe(self.on_attacks)
+        self.bus = bus
+
+    def on_attacks(self, batch):
+        self.writer.writerows(batch.rows().tolist())
+
+    def close(self):
+        self.bus.unsubscribe(self.subscription)
+        self.file.close()
+
+
+if __name__ == "__main__":
+    import os
+    import tempfile
+    import time
+    from session import GameSession
+
+    print("📨 TESTANDO FLUXO DE EVENTOS\n")
+
+    session = GameSession(seed=3)
+    EventLogger(session.events)
+    for _ in range(12):
+        session.attack()
+    delivered = session.events.flush()
+    print(f"  Lote entregue: {delivered} ataques\n")
+
+    # Turbo: milhares de ataques por quadro, um lote por assinante
+    session = GameSession(seed=4)
+    path = os.path.join(tempfile.mkdtemp(), "ataques.csv")
+    exporter = CsvExporter(session.events, path)
+    calls = []
+    session.events.subscribe(on_attacks=lambda batch: calls.append(len(batch)))
+    start = time.perf_counter()
+    for frame in range(10):
+        for _ in range(2000):
+            session.attack()
+            if session.is_finished():
+                session.new_run()
+        session.events.flush()
+    elapsed = time.perf_counter() - start
+    exporter.close()
+
+    with open(path) as f:
+        exported = sum(1 for _ in f) - 1
+    assert exported == session.total_attacks == sum(calls) == len(session.damage_history)
+    assert session.stats()["critical_hits"] == session.critical_hits
+    print(f"  {session.total_attacks} ataques em {len(calls)} lotes ({elapsed:.2f}s), "
+          f"{exported} linhas exportadas")
+
+    print("\n✅ Módulo funcionando corretamente!")
@@ -0,0 +1,238 @@
+import math
+
+import numpy as np
+
+
+def chi2_sf(x, df):
+    """P(X >= x) para X ~ qui-quadrado com `df` graus de liberdade"""
+    if df <= 0:
+        return float("nan")
+    if x <= 0:
+        return 1.0
+    return _gammaincc(df / 2.0, x / 2.0)
+
+
+def _gammaincc(a, x):
+    """Função gama incompleta superior regularizada Q(a, x)"""
+    log_prefix = a * math.log(x) - x - math.lgamma(a)
+    if x < a + 1.0:
+        # Série para P(a, x)
+        term = total = 1.0 / a
+        ap = a
+        for _ in range(1000):
+            ap += 1.0
+            term *= x / ap
+            total += term
+            if abs(term) < abs(total) * 1e-15:
+                break
+        return max(0.0, 1.0 - total * math.exp(log_prefix))
+
+    # Fração continuada (Lentz) para Q(a, x)
+    tiny = 1e-300
+    b = x + 1.0 - a
+    c = 1.0 / tiny
+    d = 1.0 / b
+    h = d
+    for i in range(1, 1000):
+        an = -i * (i - a)
+        b += 2.0
+        d = an * d + b
+        d = tiny if abs(d) < tiny else d
+        c = b + an / c
+        c = tiny if abs(c) < tiny else c
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-15:
+            break
+    return min(1.0, math.exp(log_prefix) * h)
+
+
+def kolmogorov_sf(statistic, n):
+    """P(D >= statistic) assintótico para o teste KS com n observações
+
+    Para distribuições discretas o teste fica conservador (p-valores maiores).
+    """
+    if n == 0 or statistic <= 0:
+        return 1.0
+    lam = (math.sqrt(n) + 0.12 + 0.11 / math.sqrt(n)) * statistic
+    total = 0.0
+    for k in range(1, 101):
+        term = 2.0 * (-1) ** (k - 1) * math.exp(-2.0 * (k * lam) ** 2)
+        total += term
+        if abs(term) < 1e-12:
+            break
+    return min(1.0, max(0.0, total))
+
+
+_MODELS = {}
+
+
+def _model(pmf):
+    """Constantes derivadas da distribuição, compartilhadas entre instâncias
+
+    Muitas sessões testam as mesmas armas; assim cada instância guarda
+    apenas o seu vetor de contagens.
+    """
+    pmf = np.asarray(pmf, dtype=float)
+    key = pmf.tobytes()
+    model = _MODELS.get(key)
+    if model is None:
+        with np.errstate(divide="ignore"):
+            inv_p = np.where(pmf > 0, 1.0 / pmf, 0.0)
+            log_p = np.where(pmf > 0, np.log(pmf), 0.0)
+        model = (pmf, np.cumsum(pmf), inv_p, log_p, int(np.count_nonzero(pmf)))
+        _MODELS[key] = model
+    return model
+
+
+class GoodnessOfFit:
+    """Testes de aderência incrementais (observado vs distribuição teórica)
+
+    Mantém apenas o vetor de contagens por valor de dano e algumas somas
+    acumuladas, de modo que cada ataque atualiza qui-quadrado e razão de
+    verossimilhança (G) em O(1). O KS percorre a CDF (O(valores possíveis))
+    apenas quando é consultado.
+    """
+
+    def __init__(self, pmf, offset=0):
+        self.offset = offset
+        self.pmf, self.cdf, self._inv_p, self._log_p, self.support = _model(pmf)
+        self.reset()
+
+    def reset(self):
+        self.counts = np.zeros(len(self.pmf), dtype=np.int64)
+        self.n = 0
+        self._sum_o2_p = 0.0    # soma de O^2 / p
+        self._sum_olog_o = 0.0  # soma de O ln O
+        self._sum_olog_p = 0.0  # soma de O ln p
+
+    @classmethod
+    def from_counts(cls, pmf, offset, counts):
+        """Instância reconstruída só a partir das contagens (somas recalculadas)"""
+        fit = cls(pmf, offset)
+        fit.add_counts(np.asarray(counts, dtype=np.int64))
+        return fit
+
+    def update(self, value):
+        """Registra uma observação em O(1)"""
+        i = value - self.offset
+        o = int(self.counts[i])
+        if o:
+            self._sum_olog_o += (o + 1) * math.log(o + 1) - o * math.log(o)
+        self._sum_o2_p += (2 * o + 1) * self._inv_p[i]
+        self._sum_olog_p += self._log_p[i]
+        self.counts[i] = o + 1
+        self.n += 1
+
+    def update_many(self, values):
+        """Registra um lote de observações de uma vez (vetorizado)"""
+        values = np.asarray(values, dtype=np.int64) - self.offset
+        self.add_counts(np.bincount(values, minlength=len(self.pmf)))
+
+    def add_counts(self, counts):
+        """Soma um vetor de contagens (mesmo formato de `self.counts`)"""
+        old = self.counts
+        new = old + counts
+        self._sum_o2_p += float(np.dot(new.astype(float) ** 2 - old.astype(float) ** 2, self._inv_p))
+        self._sum_olog_o += float(_xlogx(new).sum() - _xlogx(old).sum())
+        self._sum_olog_p += float(np.dot(counts, self._log_p))
+        self.counts = new
+        self.n += int(counts.sum())
+
+    def mean(self):
+        """Média observada, calculada a partir das contagens"""
+        if self.n == 0:
+            return 0.0
+        values = np.arange(self.offset, self.offset + len(self.counts))
+        return float(np.dot(values, self.counts) / self.n)
+
+    def chi_square(self):
+        """Retorna (estatística, graus de liberdade, p-valor) do qui-quadrado"""
+        if self.n == 0:
+            return 0.0, self.support - 1, 1.0
+        statistic = max(0.0, self._sum_o2_p / self.n - self.n)
+        df = self.support - 1
+        return statistic, df, chi2_sf(statistic, df)
+
+    def g_test(self):
+        """Retorna (G, graus de liberdade, p-valor) da razão de verossimilhança"""
+        if self.n == 0:
+            return 0.0, self.support - 1, 1.0
+        statistic = 2.0 * (self._sum_olog_o - self._sum_olog_p - self.n * math.log(self.n))
+        statistic = max(0.0, statistic)
+        df = self.support - 1
+        return statistic, df, chi2_sf(statistic, df)
+
+    def ks(self):
+        """Retorna (D, p-valor) do teste de Kolmogorov-Smirnov"""
+        if self.n == 0:
+            return 0.0, 1.0
+        empirical = np.cumsum(self.counts) / self.n
+        statistic = float(np.max(np.abs(empirical - self.cdf)))
+        return statistic, kolmogorov_sf(statistic, self.n)
+
+    def summary(self):
+        """Dicionário com todos os testes"""
+        chi2, df, chi2_p = self.chi_square()
+        g, _, g_p = self.g_test()
+        d, ks_p = self.ks()
+        return {"n": self.n, "chi2": chi2, "df": df, "chi2_p": chi2_p,
+                "g": g, "g_p": g_p, "ks": d, "ks_p": ks_p}
+
+
+def _xlogx(values):
+    values = values.astype(float)
+    return np.where(values > 0, values * np.log(np.where(values > 0, values, 1.0)), 0.0)
+
+
+def rng_quality_check(weapons, rolls=1_000_000, rng=None, alpha=1e-3, chunk=250_000):
+    """Verifica o gerador de números aleatórios com milhões de rolagens
+
+    Rola cada arma `rolls` vezes (em lotes vetorizados) e aplica os testes de
+    aderência. Retorna a lista de resultados e se todas as armas passaram.
+    """
+    if rng is None:
+        rng = np.random.default_rng()
+    results = []
+    for weapon in weapons:
+        fit = GoodnessOfFit(weapon.pmf, weapon.min_damage)
+        remaining = rolls
+        while remaining > 0:
+            size = min(chunk, remaining)
+            damages, _ = weapon.roll_many(size, rng)
+            fit.update_many(damages)
+            remaining -= size
+        summary = fit.summary()
+        summary["name"] = weapon.name
+        summary["passed"] = min(summary["chi2_p"], summary["g_p"], summary["ks_p"]) >= alpha
+        results.append(summary)
+    return results, all(r["passed"] for r in results)
+
+
+if __name__ == "__main__":
+    from weapons import WEAPONS
+
+    print("📐 TESTANDO ADERÊNCIA (QUI-QUADRADO / G / KS)\n")
+
+    results, ok = rng_quality_check(WEAPONS, rolls=1_000_000, rng=np.random.default_rng(7))
+    print(f"{'Arma':<20} {'chi2':>9} {'gl':>4} {'p':>7} {'G':>9} {'p':>7} {'KS':>8} {'p':>7}")
+    print("-" * 78)
+    for r in results:
+        print(f"{r['name']:<20} {r['chi2']:9.2f} {r['df']:4d} {r['chi2_p']:7.3f} "
+              f"{r['g']:9.2f} {r['g_p']:7.3f} {r['ks']:8.5f} {r['ks_p']:7.3f}"
+              f"{'' if r['passed'] else '  <- FALHOU'}")
+
+    # Incremental (O(1) por ataque) deve bater com o cálculo direto
+    weapon = WEAPONS[1]
+    fit = GoodnessOfFit(weapon.pmf, weapon.min_damage)
+    for _ in range(5000):
+        fit.update(weapon.roll()[0])
+    expected = weapon.pmf * fit.n
+    direct = float(np.sum((fit.counts - expected) ** 2 / expected))
+    assert abs(fit.chi_square()[0] - direct) < 1e-6 * max(1.0, direct)
+    rebuilt = GoodnessOfFit.from_counts(weapon.pmf, weapon.min_damage, fit.counts)
+    assert rebuilt.n == fit.n and abs(rebuilt.g_test()[0] - fit.g_test()[0]) < 1e-6
+    assert abs(chi2_sf(18.307, 10) - 0.05) < 1e-4
+
+    print("\n✅ Módulo funcionando corretamente!" if ok else "\n❌ Gerador reprovado!")
@@ -0,0 +1,110 @@
+import argparse
+import asyncio
+import json
+import time
+
+from server import DEFAULT_HOST, DEFAULT_PORT, GameServer, SessionManager
+
+
+async def play_session(host, port, seed, latencies):
+    """Cliente: cria uma sessão e ataca até a partida terminar
+
+    Metade das sessões fecha sem pedir `stats`, para exercitar a mescla das
+    estatísticas no `close`. Retorna (vitória, número de ataques).
+    """
+    reader, writer = await asyncio.open_connection(host, port)
+
+    async def call(request):
+        start = time.perf_counter()
+        writer.write(json.dumps(request).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        if not response.get("ok"):
+            raise RuntimeError(response.get("error"))
+        return response
+
+    try:
+        session_id = (await call({"op": "new", "seed": seed}))["session"]
+        state = None
+        attacks = 0
+        while state is None or not (state["game_over"] or state["victory"]):
+            state = (await call({"op": "attack", "session": session_id}))["state"]
+            attacks += 1
+        if seed % 2:
+            await call({"op": "stats", "session": session_id})
+        await call({"op": "close", "session": session_id})
+        return state["victory"], attacks
+    finally:
+        writer.close()
+        await writer.wait_closed()
+
+
+async def run_load(host, port, sessions, concurrency):
+    """Joga `sessions` partidas com até `concurrency` conexões simultâneas"""
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def worker(seed):
+        async with semaphore:
+            return await play_session(host, port, seed, latencies)
+
+    start = time.perf_counter()
+    results = await asyncio.gather(*(worker(seed) for seed in range(sessions)))
+    elapsed = time.perf_counter() - start
+
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"op": "global_stats"}\n')
+    await writer.drain()
+    global_stats = json.loads(await reader.readline())["stats"]
+    writer.close()
+    await writer.wait_closed()
+
+    latencies.sort()
+    return {
+        "sessions": sessions,
+        "victories": sum(victory for victory, _ in results),
+        "attacks": sum(attacks for _, attacks in results),
+        "requests": len(latencies),
+        "elapsed": elapsed,
+        "requests_per_s": len(latencies) / elapsed,
+        "p50_ms": latencies[len(latencies) // 2] * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99)] * 1000,
+        "global_stats": global_stats,
+    }
+
+
+async def _main(args):
+    server = None
+    if args.local:
+        server = await GameServer(SessionManager(max_sessions=args.sessions)).start(args.host, args.port)
+    try:
+        report = await run_load(args.host, args.port, args.sessions, args.concurrency)
+    finally:
+        if server is not None:
+            server.close()
+            await server.wait_closed()
+
+    print(f"Sessoes: {report['sessions']} (vitorias: {report['victories']})")
+    print(f"Requisicoes: {report['requests']} em {report['elapsed']:.2f}s "
+          f"({report['requests_per_s']:.0f} req/s)")
+    print(f"Latencia: p50={report['p50_ms']:.2f}ms p99={report['p99_ms']:.2f}ms")
+    merged = report["global_stats"]["attacks"]
+    print(f"Ataques: {report['attacks']} (mesclados nas estatisticas globais: {merged})")
+    if merged != report["attacks"]:
+        print("  AVISO: ataques perdidos na mescla das estatisticas globais")
+    print("\nEstatisticas globais (todas as sessoes):")
+    for entry in report["global_stats"]["weapons"]:
+        print(f"  {entry['name']:<20} usos={entry['uses']:<7} media={entry['mean']:6.2f} "
+              f"(esperado {entry['expected']:5.2f}) crit={entry['crit_rate'] * 100:5.2f}%")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gerador de carga para o servidor do Fate's Gambit")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--sessions", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=500)
+    parser.add_argument("--local", action="store_true",
+                        help="sobe um servidor no mesmo processo antes de gerar carga")
+    asyncio.run(_main(parser.parse_args()))
@@ -1,18 +1,34 @@
 import pygame
+import argparse
+import os
 import sys
-from collections import defaultdict
 import matplotlib
 matplotlib.use('Agg')
-import matplotlib.pyplot as plt
 from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
 import numpy as np
-import random
+
+from advisor import PolicyAdvisor
+from content import DATA_DIR
+from decimation import MinMaxDecimator
+from events import CsvExporter, EventLogger
+from memory import MemoryMonitor, SoakTest
+from monsters import load_monsters
+from session import GameSession
+from snapshot import BackgroundSaver, SnapshotError, load as load_snapshot
+from time_to_kill import TimeToKill
+from weapons import load_weapons
 
 SCREEN_WIDTH = 1400
 SCREEN_HEIGHT = 800
 GAME_WIDTH = 700
 STATS_WIDTH = 700
 FPS = 60
+TURBO_ATTACKS_PER_FRAME = 2000
+TURBO_CHART_FRAMES = 30  # no turbo, os gráficos são redesenhados no máximo a cada N quadros
+HISTORY_LIMIT = 2000  # ataques brutos guardados; os gráficos usam as séries decimadas
+SNAPSHOT_PATH = os.path.join(DATA_DIR, "autosave.snap")
+AUTOSAVE_INTERVAL = 10.0  # segundos
 
 COLOR_BG = (15, 5, 30)
 COLOR_PANEL = (50, 25, 75)
@@ -25,96 +41,8 @@ COLOR_BLUE = (100, 149, 237)
 COLOR_ORANGE = (255, 140, 0)
 
 
-class Weapon:
-    """Arma com dados"""
-    def __init__(self, name, dice_notation, num_dice, sides):
-        self.name = name
-        self.dice_notation = dice_notation
-        self.num_dice = num_dice
-        self.sides = sides
-        self.min_damage = num_dice
-        self.max_damage = num_dice * sides
-        self.avg_damage = num_dice * (sides + 1) / 2
-        self.variance = num_dice * (sides ** 2 - 1) / 12
-        self.std_dev = np.sqrt(self.variance)
-    
-    def roll(self):
-        total = sum(random.randint(1, self.sides) for _ in range(self.num_dice))
-        is_max = (total == self.max_damage)
-        return total, is_max
-    
-    def get_theoretical_distribution(self):
-        if self.num_dice == 1:
-            probs = {i: 1.0 / self.sides for i in range(self.min_damage, self.max_damage + 1)}
-        else:
-            probs = {}
-            for val in range(self.min_damage, self.max_damage + 1):
-                z = (val - self.avg_damage) / self.std_dev
-                prob = np.exp(-0.5 * z ** 2) / (self.std_dev * np.sqrt(2 * np.pi))
-                probs[val] = prob
-            total = sum(probs.values())
-            probs = {k: v / total for k, v in probs.items()}
-        return probs
-
-
-class Monster:
-    """Monstro de dungeon"""
-    def __init__(self, name, hp, num_dice, sides, room):
-        self.name = name
-        self.max_hp = hp
-        self.current_hp = hp
-        self.num_dice = num_dice
-        self.sides = sides
-        self.room = room
-        self.avg_damage = num_dice * (sides + 1) / 2
-        self.is_boss = (room == 5)
-        self.turn_count = 0
-    
-    def reset(self):
-        self.current_hp = self.max_hp
-        self.turn_count = 0
-    
-    def take_damage(self, damage):
-        self.current_hp -= damage
-        if self.current_hp < 0:
-            self.current_hp = 0
-        return self.is_alive()
-    
-    def is_alive(self):
-        return self.current_hp > 0
-    
-    def attack(self):
-        self.turn_count += 1
-        if self.is_boss and self.turn_count % 3 == 0:
-            damage = sum(random.randint(1, 4) for _ in range(5))
-            return damage, True
-        damage = sum(random.randint(1, self.sides) for _ in range(self.num_dice))
-        return damage, False
-
-
-# Armas disponíveis
-WEAPONS = [
-    Weapon("Adaga Rapida", "1d6", 1, 6),
-    Weapon("Espada Comum", "2d6", 2, 6),
-    Weapon("Martelo Pesado", "3d4", 3, 4),
-    Weapon("Arco Longo", "1d12", 1, 12),
-    Weapon("Cajado Magico", "4d3", 4, 3),
-    Weapon("Critico Lendario", "1d20", 1, 20),
-]
-
-# Monstros das dungeons
-MONSTERS = [
-    Monster("Rato Gigante", 15, 1, 4, 0),
-    Monster("Zumbi Podre", 30, 1, 6, 1),
-    Monster("Esqueleto Guerreiro", 45, 2, 4, 2),
-    Monster("Espectro Sombrio", 60, 1, 10, 3),
-    Monster("Lobisomem Feroz", 80, 2, 6, 4),
-    Monster("Dragao de Variancia", 150, 3, 6, 5),
-]
-
-
-class Game:
-    def __init__(self):
+class Game(GameSession):
+    def __init__(self, memory_interval=None, autosave_interval=AUTOSAVE_INTERVAL, weapons=None, monsters=None):
         pygame.init()
         self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
         pygame.display.set_caption("Fate's Gambit - Simulador Estatistico")
@@ -124,74 +52,116 @@ class Game:
         self.font_large = pygame.font.Font(None, 36)
         self.font_huge = pygame.font.Font(None, 80)
         
-        self.weapons = WEAPONS
-        self.monsters = MONSTERS
-        
-        self.player_hp = 100
-        self.max_hp = 100
-        self.current_room = 0
-        self.current_monster = None
-        self.turn = 0
-        self.game_over = False
-        self.victory = False
-        
-        self.damage_history = []
-        self.weapon_usage = defaultdict(list)
-        self.critical_hits = 0
-        self.total_attacks = 0
-        self.last_player_damage = None
-        self.last_monster_damage = None
-        self.last_weapon_used = None
-        
+        # Figuras reaproveitadas a cada quadro (sem pyplot, sem novas figuras)
+        self.stats_figure = Figure(figsize=(7, 8), facecolor='#0f051e', dpi=100)
+        self.stats_canvas = FigureCanvasAgg(self.stats_figure)
+        self.final_figure = Figure(figsize=(13, 3.2), facecolor='#0f051e', dpi=100)
+        self.final_canvas = FigureCanvasAgg(self.final_figure)
+        
+        self.memory = MemoryMonitor(interval=memory_interval)
+        self.memory.register("charts_bytes", self.chart_memory)
+        self.memory.register("history_bytes", self.history_memory)
+        self.memory.register("fonts", self.font_count)
+        
+        # Modo estratégia: o jogador escolhe a arma (com ajuda do conselheiro)
+        self.strategy_mode = False
+        self.selected_weapon = 0
+        
+        # Histórico de dano e média acumulada decimados (no máximo ~2 pontos por pixel)
+        self.history_plot = MinMaxDecimator(max_points=2 * STATS_WIDTH)
+        self.mean_plot = MinMaxDecimator(max_points=2 * SCREEN_WIDTH // 3)
+        self.plotted_damage = 0  # soma dos danos já entregues a `mean_plot`
+        self.plots = (self.history_plot, self.mean_plot)  # salvas no snapshot
+        self.stats_surface = None
+        self.final_surface = None
+        self.charts_dirty = True
+        self.frames_since_chart = 0
+        self.turbo = False
+        
+        GameSession.__init__(self, weapons, monsters, history_limit=HISTORY_LIMIT)
+        # Assinantes do fluxo de eventos (lotes entregues uma vez por quadro)
+        self.events.subscribe(on_attacks=self.plot_attacks)
+        self.events.subscribe(on_attacks=self.invalidate_charts, on_rooms=self.invalidate_charts)
+        self.advisor = PolicyAdvisor.load(self.weapons, self.monster_templates, self.max_hp)
+        self.ttk = TimeToKill.load(self.weapons, self.monster_templates)
+        # Autosave em segundo plano (F5 salva na hora, F6 restaura)
+        self.saver = BackgroundSaver(self, SNAPSHOT_PATH, interval=autosave_interval)
+    
+    def reset(self):
+        """Reinicia a partida sem reinicializar o pygame nem a janela"""
+        GameSession.reset(self)
+        self.history_plot.reset()
+        self.mean_plot.reset()
+        self.plotted_damage = 0
         self.flash_timer = 0
-        
-        self.start_room()
+        self.invalidate_charts()
     
-    def start_room(self):
-        if self.current_room >= len(self.monsters):
-            self.victory = True
-            return
-        self.current_monster = self.monsters[self.current_room]
-        self.current_monster.reset()
+    def resume(self, path=SNAPSHOT_PATH):
+        """Restaura a partida salva; retorna False se não houver snapshot válido"""
+        try:
+            load_snapshot(self, path)
+        except (OSError, SnapshotError) as exc:
+            print(f"[snapshot] Nao foi possivel restaurar {path}: {exc}")
+            return False
+        self.plotted_damage = self.total_damage  # o snapshot é montado depois do flush
+        return True
     
-    def attack(self):
-        if not self.current_monster or not self.current_monster.is_alive():
-            return
-        
-        weapon_idx = random.randint(0, len(self.weapons) - 1)
-        weapon = self.weapons[weapon_idx]
-        self.last_weapon_used = weapon
-        
-        # Ataque do jogador
-        damage, is_critical = weapon.roll()
-        self.current_monster.take_damage(damage)
-        
-        self.total_attacks += 1
-        self.turn += 1
-        self.last_player_damage = (damage, is_critical)
-        self.flash_timer = 15 if is_critical else 8
-        
-        self.damage_history.append(damage)
-        self.weapon_usage[weapon_idx].append(damage)
-        if is_critical:
-            self.critical_hits += 1
-        
-        if not self.current_monster.is_alive():
-            self.current_room += 1
-            self.last_monster_damage = None
-            if self.current_room < len(self.monsters):
-                self.start_room()
-            else:
-                self.victory = True
-            return
-        
-        monster_damage, is_special = self.current_monster.attack()
-        self.player_hp -= monster_damage
-        self.last_monster_damage = (monster_damage, is_special)
-        
-        if self.player_hp <= 0:
-            self.player_hp = 0
-            self.game_over = True
+    def plot_attacks(self, batch):
+        """Assinante: acrescenta o lote às séries decimadas (vetorizado)"""
+        self.history_plot.extend_many(batch.damage)
+        sums = self.plotted_damage + np.cumsum(batch.damage)
+        self.mean_plot.extend_many(sums / np.arange(self.mean_plot.n + 1, self.mean_plot.n + len(batch) + 1))
+        self.plotted_damage = int(sums[-1])
+    
+    def invalidate_charts(self, _events=None):
+        """Assinante: os gráficos são redesenhados só quando há eventos novos"""
+        self.charts_dirty = True
+        self.final_surface = None
+    
+    def turbo_step(self):
+        """Modo turbo: muitos ataques por quadro, masmorras em sequência (estatísticas acumulam)"""
+        for _ in range(TURBO_ATTACKS_PER_FRAME):
+            self.attack()
+            if self.is_finished():
+                self.new_run()
+    
+    def chosen_weapon(self):
+        """Arma do próximo ataque: a escolhida no modo estratégia, senão sorteada"""
+        return self.selected_weapon if self.strategy_mode else None
+    
+    def advice(self):
+        """(melhor arma, chance de vitória) no estado atual - consulta O(1)"""
+        monster = self.current_monster
+        if monster is None or self.is_finished():
+            return None, None
+        args = (self.current_room, self.player_hp, monster.current_hp, monster.turn_count)
+        return self.advisor.best_weapon(*args), self.advisor.win_probability(*args)
+    
+    def chart_memory(self):
+        """Bytes dos buffers de desenho das figuras"""
+        total = 0
+        for canvas in (self.stats_canvas, self.final_canvas):
+            width, height = canvas.get_width_height()
+            total += width * height * 4
+        return total
+    
+    def history_memory(self):
+        """Bytes aproximados do histórico e dos acumuladores de estatísticas"""
+        total = sys.getsizeof(self.damage_history)
+        total += sum(fit.counts.nbytes for fit in self.fits.values())
+        for plot in (self.history_plot, self.mean_plot):
+            total += plot.min_x.nbytes + plot.min_y.nbytes + plot.max_x.nbytes + plot.max_y.nbytes
+        return total
+    
+    def font_count(self):
+        return sum(isinstance(v, pygame.font.Font) for v in vars(self).values())
+    
+    def attack(self, weapon_idx=None):
+        weapon_idx = GameSession.attack(self, weapon_idx)
+        if weapon_idx is not None:
+            _, is_critical = self.last_player_damage
+            self.flash_timer = 15 if is_critical else 8
+        return weapon_idx
     
     def draw_text(self, text, x, y, color=COLOR_WHITE, font=None):
         if font is None:
@@ -220,10 +190,12 @@ class Game:
             pygame.draw.rect(self.screen, COLOR_WHITE, (20, 200, GAME_WIDTH - 40, 140), 2)
             
             boss_tag = " [CHEFE]" if self.current_monster.is_boss else ""
-            self.draw_text(f"SALA {self.current_room + 1}/6", 40, 215, COLOR_GOLD, self.font_large)
+            self.draw_text(f"SALA {self.current_room + 1}/{len(self.monsters)}", 40, 215, COLOR_GOLD, self.font_large)
             self.draw_text(f"{self.current_monster.name}{boss_tag}", 40, 255, COLOR_RED, self.font_large)
             self.draw_text(f"HP: {self.current_monster.current_hp} / {self.current_monster.max_hp}", 
                           40, 290, COLOR_WHITE)
+            hits_left = self.ttk.expected_hits(self.chosen_weapon(), self.current_monster.current_hp)
+            self.draw_text(f"Golpes restantes (esperado): {hits_left:.1f}", 380, 292, COLOR_GRAY, self.font_small)
             self.draw_hp_bar(40, 315, GAME_WIDTH - 80, 20, 
                            self.current_monster.current_hp, self.current_monster.max_hp, COLOR_RED)
         
@@ -235,7 +207,7 @@ class Game:
         if self.last_weapon_used and self.last_player_damage:
             damage, is_crit = self.last_player_damage
             
-            self.draw_text(f"Arma Sorteada:", 40, 420, COLOR_WHITE)
+            self.draw_text("Arma Escolhida:" if self.strategy_mode else "Arma Sorteada:", 40, 420, COLOR_WHITE)
             self.draw_text(f"{self.last_weapon_used.name}", 40, 445, COLOR_BLUE, self.font_large)
             self.draw_text(f"({self.last_weapon_used.dice_notation})", 40, 480, COLOR_GRAY)
             
@@ -262,11 +234,22 @@ class Game:
         pygame.draw.rect(self.screen, button_color, (20, SCREEN_HEIGHT - 120, GAME_WIDTH - 40, 100))
         pygame.draw.rect(self.screen, COLOR_WHITE, (20, SCREEN_HEIGHT - 120, GAME_WIDTH - 40, 100), 4)
         self.draw_text("ROLAR DADOS!", 200, SCREEN_HEIGHT - 90, COLOR_WHITE, self.font_huge)
-        self.draw_text("(Arma sera escolhida aleatoriamente)", 150, SCREEN_HEIGHT - 40, COLOR_GRAY, self.font_small)
+        if self.strategy_mode:
+            weapon = self.weapons[self.selected_weapon]
+            best, win_prob = self.advice()
+            advice_text = ""
+            if best is not None:
+                advice_text = f" | Conselheiro (A): {self.weapons[best].dice_notation} - vitoria {win_prob:.0%}"
+            self.draw_text(f"(Arma: {weapon.name} {weapon.dice_notation}{advice_text})",
+                           40, SCREEN_HEIGHT - 40, COLOR_GRAY, self.font_small)
+        else:
+            self.draw_text("(Arma sera escolhida aleatoriamente - M: modo estrategia)",
+                           120, SCREEN_HEIGHT - 40, COLOR_GRAY, self.font_small)
     
     def create_stats_graph(self):
         """Cria gráficos estatísticos"""
-        fig = plt.figure(figsize=(7, 8), facecolor='#0f051e', dpi=100)
+        fig = self.stats_figure
+        fig.clear()
         
         if self.total_attacks == 0:
             ax = fig.add_subplot(111)
@@ -275,18 +258,19 @@ class Game:
             ax.set_facecolor('#32194b')
             ax.axis('off')
         else:
-            most_used = max(self.weapon_usage.keys(), key=lambda k: len(self.weapon_usage[k]))
+            most_used = max(self.fits, key=lambda k: self.fits[k].n)
             weapon = self.weapons[most_used]
-            damages = self.weapon_usage[most_used]
+            most_used_fit = self.fits[most_used]
             
             ax1 = fig.add_subplot(3, 1, 1)
             ax1.set_facecolor('#32194b')
-            ax1.set_title(f'📊 Distribuição: {weapon.name} ({len(damages)} usos)', 
+            ax1.set_title(f'📊 Distribuição: {weapon.name} ({most_used_fit.n} usos)', 
                          color='#FFD700', fontsize=16, fontweight='bold', pad=15)
             
-            bins = range(weapon.min_damage, weapon.max_damage + 2)
-            ax1.hist(damages, bins=bins, alpha=0.7, color='#00FFFF', 
-                    edgecolor='white', label='Observado', density=True, linewidth=2)
+            # Histograma a partir das contagens (custo fixo, não cresce com a sessão)
+            ax1.bar(np.arange(weapon.min_damage, weapon.max_damage + 1), most_used_fit.counts / most_used_fit.n,
+                    width=1.0, align='edge', alpha=0.7, color='#00FFFF', 
+                    edgecolor='white', label='Observado', linewidth=2)
             
             theo_probs = weapon.get_theoretical_distribution()
             theo_x = list(theo_probs.keys())
@@ -301,6 +285,12 @@ class Game:
                       framealpha=0.9, loc='best', fancybox=True, shadow=True,
                       labelcolor='white')
             ax1.grid(True, alpha=0.5, color='white', linestyle='--', linewidth=1)
+            fit = self.fits[most_used].summary()
+            ax1.text(0.01, 0.97, f"χ²={fit['chi2']:.1f} (p={fit['chi2_p']:.2f})\n"
+                                 f"G={fit['g']:.1f} (p={fit['g_p']:.2f})\n"
+                                 f"KS={fit['ks']:.3f} (p={fit['ks_p']:.2f})",
+                    transform=ax1.transAxes, ha='left', va='top', color='white', fontsize=10,
+                    bbox=dict(facecolor='#1a0d2e', edgecolor='#FFD700', alpha=0.8))
             ax1.spines['bottom'].set_color('white')
             ax1.spines['top'].set_color('white')
             ax1.spines['left'].set_color('white')
@@ -314,10 +304,11 @@ class Game:
             ax2.set_facecolor('#32194b')
             ax2.set_title('📈 Histórico de Dano', color='#FFD700', fontsize=16, fontweight='bold', pad=15)
             
-            ax2.plot(range(1, len(self.damage_history) + 1), self.damage_history, 
-                    'g-', linewidth=2.5, marker='o', markersize=5, alpha=0.8, 
+            xs, ys = self.history_plot.points()
+            marker = 'o' if self.history_plot.bucket_size == 1 and len(xs) <= 100 else None
+            ax2.plot(xs, ys, 'g-', linewidth=2.5 if marker else 1.0, marker=marker, markersize=5, alpha=0.8, 
                     markerfacecolor='lime', markeredgecolor='green', markeredgewidth=1)
-            mean_val = np.mean(self.damage_history)
+            mean_val = self.total_damage / self.total_attacks
             ax2.axhline(y=mean_val, color='#00FFFF', linestyle='--', 
                        linewidth=3, label=f'Média: {mean_val:.2f}', alpha=0.9)
             ax2.set_xlabel('Ataque #', color='white', fontsize=14, fontweight='bold')
@@ -344,11 +335,11 @@ class Game:
             theo_avgs = []
             obs_avgs = []
             
-            for weapon_idx, damages in sorted(self.weapon_usage.items()):
-                if len(damages) > 0:
+            for weapon_idx, fit in sorted(self.fits.items()):
+                if fit.n > 0:
                     weapon_names.append(self.weapons[weapon_idx].dice_notation)
                     theo_avgs.append(self.weapons[weapon_idx].avg_damage)
-                    obs_avgs.append(np.mean(damages))
+                    obs_avgs.append(fit.mean())
             
             if len(weapon_names) > 0:
                 x = np.arange(len(weapon_names))
@@ -384,21 +375,27 @@ class Game:
                 ax3.spines['left'].set_linewidth(2)
                 ax3.spines['right'].set_linewidth(2)
         
-        plt.tight_layout(pad=2.0)
+        fig.tight_layout(pad=2.0)
         
-        canvas = FigureCanvasAgg(fig)
+        canvas = self.stats_canvas
         canvas.draw()
         buf = canvas.buffer_rgba()
         size = canvas.get_width_height()
         surf = pygame.image.frombuffer(buf, size, "RGBA")
-        plt.close(fig)
         
         return surf
     
     def draw_stats_panel(self):
         """Desenha painel de estatísticas (metade direita)"""
-        graph_surface = self.create_stats_graph()
-        self.screen.blit(graph_surface, (GAME_WIDTH, 0))
+        # No turbo, muitos lotes por segundo: redesenha no máximo a cada TURBO_CHART_FRAMES quadros
+        throttled = self.turbo and self.frames_since_chart < TURBO_CHART_FRAMES
+        if self.stats_surface is None or (self.charts_dirty and not throttled):
+            self.stats_surface = self.create_stats_graph()
+            self.charts_dirty = False
+            self.frames_since_chart = 0
+        else:
+            self.frames_since_chart += 1
+        self.screen.blit(self.stats_surface, (GAME_WIDTH, 0))
     
     def draw_game_over(self):
         """Tela de game over com estatísticas"""
@@ -410,7 +407,7 @@ class Game:
                          SCREEN_WIDTH // 2 - 280, 140, COLOR_WHITE, self.font_large)
         else:
             self.draw_text("DERROTA!", SCREEN_WIDTH // 2 - 120, 50, COLOR_RED, self.font_huge)
-            self.draw_text(f"Voce chegou ate a Sala {self.current_room + 1}/6", 
+            self.draw_text(f"Voce chegou ate a Sala {self.current_room + 1}/{len(self.monsters)}", 
                          SCREEN_WIDTH // 2 - 200, 140, COLOR_WHITE, self.font_large)
         
         panel_y = 200
@@ -425,12 +422,13 @@ class Game:
         y += 30
         
         if self.total_attacks > 0:
-            avg_damage = np.mean(self.damage_history)
+            avg_damage = self.total_damage / self.total_attacks
             self.draw_text(f"Dano Medio Causado: {avg_damage:.2f}", 80, y, COLOR_WHITE)
             y += 30
             
-            max_damage = max(self.damage_history)
-            min_damage = min(self.damage_history)
+            observed = [fit.offset + np.flatnonzero(fit.counts) for fit in self.fits.values() if fit.n]
+            max_damage = max(int(values[-1]) for values in observed)
+            min_damage = min(int(values[0]) for values in observed)
             self.draw_text(f"Maior Dano: {max_damage}", 80, y, COLOR_GREEN)
             y += 30
             self.draw_text(f"Menor Dano: {min_damage}", 80, y, COLOR_ORANGE)
@@ -451,12 +449,13 @@ class Game:
         
         y = panel2_y + 70
         
-        sorted_weapons = sorted(self.weapon_usage.items(), key=lambda x: len(x[1]), reverse=True)
+        sorted_weapons = sorted(((idx, fit) for idx, fit in self.fits.items() if fit.n),
+                                key=lambda x: x[1].n, reverse=True)
         
-        for weapon_idx, damages in sorted_weapons[:5]:
+        for weapon_idx, weapon_fit in sorted_weapons[:5]:
             weapon = self.weapons[weapon_idx]
-            uses = len(damages)
-            avg = np.mean(damages)
+            uses = weapon_fit.n
+            avg = weapon_fit.mean()
             theo_avg = weapon.avg_damage
             diff = avg - theo_avg
             diff_symbol = "+" if diff > 0 else ""
@@ -466,20 +465,24 @@ class Game:
             self.draw_text(f"  Sorteios: {uses} | Media: {avg:.2f} (esperado: {theo_avg:.1f})", 
                          panel2_x + 30, y, COLOR_GRAY, self.font_small)
             
+            fit = self.fits[weapon_idx].summary()
             diff_color = COLOR_GREEN if diff > 0 else COLOR_ORANGE if diff < 0 else COLOR_WHITE
-            self.draw_text(f"  Diferenca: {diff_symbol}{diff:.2f}", 
+            self.draw_text(f"  Diferenca: {diff_symbol}{diff:.2f} | qui2 p={fit['chi2_p']:.2f} | "
+                         f"G p={fit['g_p']:.2f} | KS p={fit['ks_p']:.2f}", 
                          panel2_x + 30, y + 20, diff_color, self.font_small)
             y += 50
         
-        graph_surface = self.create_final_stats_graph()
-        self.screen.blit(graph_surface, (50, 500))
+        if self.final_surface is None:
+            self.final_surface = self.create_final_stats_graph()
+        self.screen.blit(self.final_surface, (50, 500))
         
         self.draw_text("Pressione ESC para sair ou R para reiniciar", 
                      SCREEN_WIDTH // 2 - 250, SCREEN_HEIGHT - 40, COLOR_GRAY)
     
     def create_final_stats_graph(self):
         """Cria gráfico de estatísticas finais"""
-        fig = plt.figure(figsize=(13, 3.2), facecolor='#0f051e', dpi=100)
+        fig = self.final_figure
+        fig.clear()
         
         if self.total_attacks == 0:
             ax = fig.add_subplot(111)
@@ -488,18 +491,18 @@ class Game:
             ax.set_facecolor('#32194b')
             ax.axis('off')
         else:
-            most_used = max(self.weapon_usage.keys(), key=lambda k: len(self.weapon_usage[k]))
+            most_used = max(self.fits, key=lambda k: self.fits[k].n)
             weapon = self.weapons[most_used]
-            damages = self.weapon_usage[most_used]
+            most_used_fit = self.fits[most_used]
             
             ax1 = fig.add_subplot(1, 3, 1)
             ax1.set_facecolor('#32194b')
             ax1.set_title(f'📊 {weapon.name}\nTeórico vs Observado', 
                          color='#FFD700', fontsize=14, fontweight='bold', pad=12)
             
-            bins = range(weapon.min_damage, weapon.max_damage + 2)
-            ax1.hist(damages, bins=bins, alpha=0.7, color='#00FFFF', 
-                    edgecolor='white', label='Observado', density=True, linewidth=2)
+            ax1.bar(np.arange(weapon.min_damage, weapon.max_damage + 1), most_used_fit.counts / most_used_fit.n,
+                    width=1.0, align='edge', alpha=0.7, color='#00FFFF', 
+                    edgecolor='white', label='Observado', linewidth=2)
             
             theo_probs = weapon.get_theoretical_distribution()
             theo_x = list(theo_probs.keys())
@@ -530,11 +533,11 @@ class Game:
             theo_avgs = []
             obs_avgs = []
             
-            for weapon_idx, damages in sorted(self.weapon_usage.items()):
-                if len(damages) > 0:
+            for weapon_idx, fit in sorted(self.fits.items()):
+                if fit.n > 0:
                     weapon_names.append(self.weapons[weapon_idx].dice_notation)
                     theo_avgs.append(self.weapons[weapon_idx].avg_damage)
-                    obs_avgs.append(np.mean(damages))
+                    obs_avgs.append(fit.mean())
             
             x = np.arange(len(weapon_names))
             width = 0.35
@@ -569,15 +572,14 @@ class Game:
             ax3.set_title('📈 Convergência da Média\n(Lei dos Grandes Números)', 
                          color='#FFD700', fontsize=14, fontweight='bold', pad=12)
             
-            cumulative_avg = []
-            for i in range(1, len(self.damage_history) + 1):
-                cumulative_avg.append(np.mean(self.damage_history[:i]))
-            
-            ax3.plot(range(1, len(cumulative_avg) + 1), cumulative_avg, 
-                    'g-', linewidth=3, label='Média Acumulada', marker='o', markersize=4, alpha=0.8)
+            # Média acumulada, mantida decimada a cada lote (mínimo/máximo por balde)
+            xs, ys = self.mean_plot.points()
+            marker = 'o' if self.mean_plot.bucket_size == 1 and len(xs) <= 100 else None
+            ax3.plot(xs, ys, 'g-', linewidth=3 if marker else 1.5, label='Média Acumulada',
+                    marker=marker, markersize=4, alpha=0.8)
             
-            total_theo = sum(self.weapons[idx].avg_damage * len(dmgs) 
-                           for idx, dmgs in self.weapon_usage.items())
+            total_theo = sum(self.weapons[idx].avg_damage * fit.n 
+                           for idx, fit in self.fits.items())
             expected_avg = total_theo / self.total_attacks
             ax3.axhline(y=expected_avg, color='#FF4444', linestyle='--', 
                        linewidth=3, label=f'Esperado: {expected_avg:.2f}', alpha=0.9)
@@ -593,14 +595,13 @@ class Game:
                 spine.set_color('white')
                 spine.set_linewidth(2)
         
-        plt.tight_layout(pad=2.5)
+        fig.tight_layout(pad=2.5)
         
-        canvas = FigureCanvasAgg(fig)
+        canvas = self.final_canvas
         canvas.draw()
         buf = canvas.buffer_rgba()
         size = canvas.get_width_height()
         surf = pygame.image.frombuffer(buf, size, "RGBA")
-        plt.close(fig)
         
         return surf
     
@@ -610,12 +611,22 @@ class Game:
             if event.type == pygame.QUIT:
                 return False
             
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F9:
+                self.memory.snapshot()
+                continue
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F5:
+                self.saver.save_now()
+                continue
+            if event.type == pygame.KEYDOWN and event.key == pygame.K_F6:
+                self.resume()
+                continue
+            
             if self.game_over or self.victory:
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_ESCAPE:
                         return False
                     elif event.key == pygame.K_r:
-                        self.__init__()
+                        self.reset()
                 continue
             
             if event.type == pygame.MOUSEBUTTONDOWN:
@@ -624,12 +635,24 @@ class Game:
                 if (20 <= mouse_x <= GAME_WIDTH - 20 and 
                     SCREEN_HEIGHT - 120 <= mouse_y <= SCREEN_HEIGHT - 20):
                     if self.current_monster and self.current_monster.is_alive():
-                        self.attack()
+                        self.attack(self.chosen_weapon())
             
             if event.type == pygame.KEYDOWN:
                 if event.key == pygame.K_SPACE or event.key == pygame.K_RETURN:
                     if self.current_monster and self.current_monster.is_alive():
-                        self.attack()
+                        self.attack(self.chosen_weapon())
+                elif event.key == pygame.K_m:
+                    self.strategy_mode = not self.strategy_mode
+                elif event.key == pygame.K_t:
+                    self.turbo = not self.turbo
+                elif self.strategy_mode and event.key == pygame.K_UP:
+                    self.selected_weapon = (self.selected_weapon - 1) % len(self.weapons)
+                elif self.strategy_mode and event.key == pygame.K_DOWN:
+                    self.selected_weapon = (self.selected_weapon + 1) % len(self.weapons)
+                elif self.strategy_mode and event.key == pygame.K_a:
+                    best, _ = self.advice()
+                    if best is not None:
+                        self.selected_weapon = best
         
         return True
     
@@ -640,6 +663,11 @@ class Game:
         while running:
             self.clock.tick(FPS)
             running = self.handle_events()
+            if self.turbo:
+                self.turbo_step()
+            self.events.flush()
+            self.saver.tick()
+            self.memory.tick()
             
             self.screen.fill(COLOR_BG)
             
@@ -651,11 +679,61 @@ class Game:
             
             pygame.display.flip()
         
+        self.saver.save_now()
+        self.saver.close()
         pygame.quit()
         sys.exit()
+    
+    def soak(self, duration, sample_interval=5.0, tolerance_mb=20.0):
+        """Teste de resistência: modo turbo por `duration` segundos vigiando o RSS"""
+        self.turbo = True
+        
+        def step():
+            pygame.event.pump()
+            self.turbo_step()
+            self.events.flush()
+            self.screen.fill(COLOR_BG)
+            self.draw_game_panel()
+            self.draw_stats_panel()
+            pygame.display.flip()
+        
+        test = SoakTest(step, duration, sample_interval=sample_interval, tolerance_mb=tolerance_mb)
+        ok = test.run()
+        self.memory.snapshot()
+        return ok
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fate's Gambit - Simulador Estatistico")
+    parser.add_argument("--soak", type=float, metavar="HORAS",
+                        help="modo de resistencia: ataques automaticos sem janela, falha se a memoria crescer")
+    parser.add_argument("--mem-interval", type=float, metavar="SEGUNDOS",
+                        help="tira snapshots de memoria (tracemalloc) periodicamente")
+    parser.add_argument("--log-events", action="store_true",
+                        help="registra no terminal os eventos de sala e um resumo de cada lote de ataques")
+    parser.add_argument("--export", metavar="ARQUIVO.csv",
+                        help="grava todos os ataques em CSV")
+    parser.add_argument("--weapons", metavar="ARQUIVO",
+                        help="carrega as armas de um arquivo JSON/TOML proprio")
+    parser.add_argument("--monsters", metavar="ARQUIVO",
+                        help="carrega os monstros de um arquivo JSON/TOML proprio")
+    parser.add_argument("--resume", action="store_true",
+                        help=f"continua a partida salva em {os.path.relpath(SNAPSHOT_PATH)}")
+    parser.add_argument("--autosave", type=float, default=AUTOSAVE_INTERVAL, metavar="SEGUNDOS",
+                        help="intervalo do salvamento automatico (0 desativa)")
+    args = parser.parse_args()
+    content = {
+        "weapons": load_weapons(args.weapons) if args.weapons else None,
+        "monsters": load_monsters(args.monsters) if args.monsters else None,
+    }
+    
+    if args.soak:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        game = Game(memory_interval=args.mem_interval, autosave_interval=None, **content)
+        ok = game.soak(args.soak * 3600)
+        pygame.quit()
+        sys.exit(0 if ok else 1)
+    
     print("=" * 60)
     print("FATE'S GAMBIT - Simulador Estatistico")
     print("=" * 60)
@@ -664,10 +742,24 @@ if __name__ == "__main__":
     print("=" * 60)
     print("Controles:")
     print("  CLIQUE ou ESPACO: Rolar dados (arma aleatoria)")
+    print("  M: Modo estrategia (voce escolhe a arma)")
+    print("  T: Modo turbo (milhares de ataques por quadro)")
+    print("  CIMA / BAIXO: Trocar de arma | A: Usar a arma do conselheiro")
     print("  ESC: Sair (na tela final)")
     print("  R: Reiniciar (na tela final)")
+    print("  F5: Salvar partida | F6: Restaurar partida salva")
+    print("  F9: Snapshot de memoria")
     print("=" * 60)
     print("\nObserve os graficos em tempo real na metade direita!\n")
     
-    game = Game()
-    game.run()
\ No newline at end of file
+    game = Game(memory_interval=args.mem_interval, autosave_interval=args.autosave or None, **content)
+    if args.resume:
+        game.resume()
+    if args.log_events:
+        EventLogger(game.events)
+    exporter = CsvExporter(game.events, args.export) if args.export else None
+    try:
+        game.run()
+    finally:
+        if exporter is not None:
+            exporter.close()
\ No newline at end of file
@@ -0,0 +1,135 @@
+import os
+import time
+import tracemalloc
+
+
+def rss_bytes():
+    """Memória residente (RSS) atual do processo, em bytes"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, AttributeError):
+        import resource
+        # ru_maxrss é o pico (KB no Linux, bytes no macOS): melhor que nada
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if peak > 1 << 32 else peak * 1024
+
+
+class MemoryMonitor:
+    """Snapshots do tracemalloc e contadores de memória por subsistema
+
+    Os snapshots podem ser disparados por tecla (`snapshot()`) ou por tempo
+    (`tick()` a cada quadro, com `interval` em segundos). Cada snapshot mostra
+    as linhas que mais cresceram desde o anterior e os contadores registrados.
+    """
+
+    def __init__(self, interval=None, top=10, frames=1, log=print):
+        self.interval = interval
+        self.top = top
+        self.frames = frames
+        self.log = log
+        self.counters_fns = {}
+        self.previous = None
+        self.last_time = time.monotonic()
+
+    def register(self, name, fn):
+        """Registra um contador: `fn()` retorna o uso (bytes ou quantidade)"""
+        self.counters_fns[name] = fn
+
+    def counters(self):
+        values = {name: fn() for name, fn in self.counters_fns.items()}
+        values["rss"] = rss_bytes()
+        return values
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+
+    def snapshot(self):
+        """Tira um snapshot e registra o crescimento desde o anterior"""
+        self.start()
+        current = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+        ))
+        lines = [f"--- Memoria ({time.strftime('%H:%M:%S')}) ---"]
+        for name, value in self.counters().items():
+            lines.append(f"  {name:<12} {_format_value(name, value)}")
+        if self.previous is not None:
+            lines.append("  Maiores crescimentos desde o ultimo snapshot:")
+            for stat in current.compare_to(self.previous, "lineno")[:self.top]:
+                lines.append(f"    {stat}")
+        else:
+            lines.append("  Maiores alocacoes:")
+            for stat in current.statistics("lineno")[:self.top]:
+                lines.append(f"    {stat}")
+        self.previous = current
+        self.last_time = time.monotonic()
+
+        report = "\n".join(lines)
+        self.log(report)
+        return report
+
+    def tick(self):
+        """Chamado a cada quadro: tira snapshot se o intervalo venceu"""
+        if self.interval and time.monotonic() - self.last_time >= self.interval:
+            self.snapshot()
+
+
+def _format_value(name, value):
+    if name == "rss" or name.endswith("_bytes"):
+        return f"{value / 1024 / 1024:.2f} MB"
+    return str(value)
+
+
+class SoakTest:
+    """Teste de resistência: repete `step()` por horas e vigia o RSS
+
+    O RSS é amostrado a cada `sample_interval` segundos. Depois do
+    aquecimento, falha se a mediana do último quarto das amostras ficar mais
+    de `tolerance_mb` acima da mediana do primeiro quarto (crescimento
+    contínuo = vazamento).
+    """
+
+    def __init__(self, step, duration, sample_interval=5.0, warmup=0.1, tolerance_mb=20.0, log=print):
+        self.step = step
+        self.duration = duration
+        self.sample_interval = sample_interval
+        self.warmup = warmup
+        self.tolerance_mb = tolerance_mb
+        self.log = log
+        self.samples = []
+
+    def run(self):
+        """Executa o teste; retorna True se não houve crescimento de memória"""
+        start = time.monotonic()
+        next_sample = start
+        steps = 0
+        while True:
+            now = time.monotonic()
+            if now >= next_sample:
+                self.samples.append((now - start, rss_bytes()))
+                next_sample = now + self.sample_interval
+                if len(self.samples) % 12 == 0:
+                    self.log(f"[soak] {now - start:8.0f}s  {steps} passos  "
+                             f"RSS={self.samples[-1][1] / 1024 / 1024:.1f} MB")
+            if now - start >= self.duration:
+                break
+            self.step()
+            steps += 1
+        return self.verdict()
+
+    def verdict(self):
+        usable = [rss for t, rss in self.samples if t >= self.duration * self.warmup]
+        if len(usable) < 8:
+            self.log("[soak] Amostras insuficientes para avaliar")
+            return True
+        quarter = len(usable) // 4
+        first = sorted(usable[:quarter])[quarter // 2]
+        last = sorted(usable[-quarter:])[quarter // 2]
+        growth_mb = (last - first) / 1024 / 1024
+        ok = growth_mb <= self.tolerance_mb
+        self.log(f"[soak] RSS inicial={first / 1024 / 1024:.1f} MB final={last / 1024 / 1024:.1f} MB "
+                 f"crescimento={growth_mb:+.1f} MB (tolerancia {self.tolerance_mb} MB): "
+                 f"{'OK' if ok else 'FALHOU'}")
+        return ok
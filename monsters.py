@@ -1,22 +1,40 @@
 import random
 
+from content import MONSTERS_FILE, build_dice, compile_dice, load_compiled
+
+
+# Sopro de Caos: ataque especial padrão dos chefes
+BOSS_SPECIAL_DICE = "5d4"
+
 
 class Monster:
     """Representa um monstro no jogo"""
     
-    def __init__(self, name, hp, num_dice, sides, room, is_boss=False, description=""):
+    def __init__(self, name, hp, num_dice=None, sides=None, room=0, is_boss=False,
+                 description="", dice_notation=None, special_notation=None, compiled=None):
+        dice_notation = dice_notation or f"{num_dice}d{sides}"
+        if compiled is None:
+            compiled = compile_dice(dice_notation)
+        if is_boss and special_notation is None:
+            special_notation = BOSS_SPECIAL_DICE
+        
         self.name = name
         self.max_hp = hp
         self.current_hp = hp
-        self.num_dice = num_dice
-        self.sides = sides
+        self.dice = build_dice(compiled)
+        self.num_dice = compiled["num_dice"]
+        self.sides = compiled["sides"]
+        self.dice_notation = dice_notation
+        self.special_notation = special_notation
+        self.special_dice = build_dice(compile_dice(special_notation)) if special_notation else None
         self.room = room
         self.is_boss = is_boss
         self.description = description
         
-        self.avg_damage = num_dice * (sides + 1) / 2
-        self.min_damage = num_dice
-        self.max_damage = num_dice * sides
+        self.avg_damage = compiled["avg"]
+        self.min_damage = compiled["min"]
+        self.max_damage = compiled["max"]
+        self.pmf = compiled["pmf"]
         
         self.turn_count = 0
     
@@ -36,19 +54,18 @@ class Monster:
         """Verifica se o monstro está vivo"""
         return self.current_hp > 0
     
-    def attack(self):
+    def attack(self, rng=random):
         """Monstro ataca e retorna dano"""
         self.turn_count += 1
         
         if self.is_boss and self.turn_count % 3 == 0:
-            return self.special_attack()
+            return self.special_attack(rng)
         
-        damage = sum(random.randint(1, self.sides) for _ in range(self.num_dice))
-        return damage, False
+        return self.dice.roll(rng), False
     
-    def special_attack(self):
+    def special_attack(self, rng=random):
         """Ataque especial do chefe (Sopro de Caos)"""
-        damage = sum(random.randint(1, 4) for _ in range(5))
+        damage = self.special_dice.roll(rng)
         return damage, True  # True indica ataque especial
     
     def get_hp_percentage(self):
@@ -75,57 +92,38 @@ class Monster:
 
 
 
-MONSTERS = [
-    Monster(
-        name="Rato Gigante",
-        hp=15,
-        num_dice=1,
-        sides=4,
-        room=1,
-        description="Um rato do tamanho de um cachorro. Facil, mas cuidado!"
-    ),
-    Monster(
-        name="Zumbi Podre",
-        hp=30,
-        num_dice=1,
-        sides=6,
-        room=2,
-        description="Lento mas resistente. Escolha sua arma com sabedoria."
-    ),
-    Monster(
-        name="Esqueleto Guerreiro",
-        hp=45,
-        num_dice=2,
-        sides=4,
-        room=3,
-        description="Armadura ossea. Ataques consistentes sao eficazes."
-    ),
-    Monster(
-        name="Espectro Sombrio",
-        hp=60,
-        num_dice=1,
-        sides=10,
-        room=4,
-        description="Imprevisivel e perigoso. A probabilidade esta contra voce."
-    ),
-    Monster(
-        name="Lobisomem Feroz",
-        hp=80,
-        num_dice=2,
-        sides=6,
-        room=5,
-        description="Rapido e agressivo. Prepare-se para o chefe!"
-    ),
-    Monster(
-        name="Dragao de Variancia",
-        hp=150,
-        num_dice=3,
-        sides=6,
-        room=6,
-        is_boss=True,
-        description="O guardiao final. Usa Sopro de Caos a cada 3 turnos!"
-    ),
-]
+def _compile_monster(raw):
+    """Converte uma entrada do arquivo de dados em dados pré-calculados"""
+    return {
+        "name": raw["name"],
+        "hp": raw["hp"],
+        "dice": raw["dice"],
+        "room": raw.get("room", 0),
+        "is_boss": raw.get("is_boss", False),
+        "description": raw.get("description", ""),
+        "special": raw.get("special"),
+        **compile_dice(raw["dice"]),
+    }
+
+
+def load_monsters(path=MONSTERS_FILE):
+    """Carrega os monstros de um arquivo JSON/TOML (com cache pré-compilado)"""
+    return [
+        Monster(
+            name=entry["name"],
+            hp=entry["hp"],
+            room=entry["room"],
+            is_boss=entry["is_boss"],
+            description=entry["description"],
+            dice_notation=entry["dice"],
+            special_notation=entry["special"],
+            compiled=entry
+        )
+        for entry in load_compiled(path, "monsters", _compile_monster)
+    ]
+
+
+MONSTERS = load_monsters()
 
 
 def get_monster(room):
@@ -150,14 +148,20 @@ def monster_info_table():
     print("=" * 80)
     print("BESTIÁRIO - MASMORRAS DA PROBABILIDADE")
     print("=" * 80)
-    print(f"{'Sala':<6} {'Monstro':<25} {'HP':<8} {'Dano':<12} {'Avg':<6} {'Tipo':<10}")
+    print(f"{'Sala':<6} {'Monstro':<25} {'HP':<8} {'Dano':<12} {'Avg':<6} {'Tipo':<10} {'Golpes':<6}")
     print("-" * 80)
     
+    # Golpes esperados com a arma sorteada a cada ataque (matriz em cache)
+    from time_to_kill import TimeToKill
+    from weapons import WEAPONS
+    table = TimeToKill.load(WEAPONS, MONSTERS)
+    
     for i, monster in enumerate(MONSTERS):
         tipo = "CHEFE" if monster.is_boss else "Normal"
-        dano_info = f"{monster.num_dice}d{monster.sides}"
+        dano_info = monster.dice_notation
         print(f"{i+1:<6} {monster.name:<25} {monster.max_hp:<8} "
-              f"{dano_info:<12} {monster.avg_damage:<6.1f} {tipo:<10}")
+              f"{dano_info:<12} {monster.avg_damage:<6.1f} {tipo:<10} "
+              f"{table.expected_hits(None, monster.max_hp):<6.1f}")
     
     print("=" * 80)
     print(f"\nTotal de Salas: {len(MONSTERS)}")
@@ -0,0 +1,207 @@
+import math
+
+import numpy as np
+
+from simulation import CombatModel, numpy_uniforms, run_batch
+
+
+class RareEventEstimate:
+    """Estimativa de uma probabilidade a partir de amostras independentes
+
+    `values` são as amostras do estimador (indicador x peso de
+    verossimilhança, ou o produto de cada réplica no caso do splitting);
+    a média é a estimativa e a variância amostral dá o erro padrão. `ess` é
+    o tamanho efetivo da amostra (Kish): quando os pesos degeneram ele cai
+    muito abaixo de `n` e a estimativa deixa de ser confiável mesmo que o
+    erro padrão pareça pequeno.
+    """
+
+    def __init__(self, values, hits, ess, n=None, player_tilt=0.0, monster_tilt=0.0):
+        values = np.asarray(values, dtype=float)
+        self.n = len(values) if n is None else n
+        self.hits = hits
+        self.ess = ess
+        self.probability = float(values.mean())
+        self.variance = float(values.var(ddof=1)) if len(values) > 1 else math.inf
+        self.std_error = math.sqrt(self.variance / len(values))
+        self.relative_error = self.std_error / self.probability if self.probability > 0 else math.inf
+        self.player_tilt = player_tilt
+        self.monster_tilt = monster_tilt
+
+    @classmethod
+    def from_weights(cls, indicator, log_weight, player_tilt=0.0, monster_tilt=0.0):
+        weights = np.where(indicator, np.exp(log_weight), 0.0)
+        return cls(weights, int(np.count_nonzero(indicator)), _kish_ess(weights),
+                   player_tilt=player_tilt, monster_tilt=monster_tilt)
+
+    def interval(self, z=1.96):
+        """Intervalo de confiança normal (95% por padrão)"""
+        return max(0.0, self.probability - z * self.std_error), self.probability + z * self.std_error
+
+    def to_dict(self):
+        return {
+            "probability": self.probability,
+            "std_error": self.std_error,
+            "relative_error": self.relative_error,
+            "ess": self.ess,
+            "n": self.n,
+            "hits": self.hits,
+            "player_tilt": self.player_tilt,
+            "monster_tilt": self.monster_tilt,
+        }
+
+    def __str__(self):
+        low, high = self.interval()
+        return (f"p={self.probability:.3e} ± {self.std_error:.1e} (IC95% [{low:.2e}, {high:.2e}], "
+                f"erro rel. {self.relative_error * 100:.1f}%, ESS={self.ess:.0f}/{self.n}, "
+                f"acertos={self.hits})")
+
+
+def _kish_ess(weights):
+    square_sum = float(np.dot(weights, weights))
+    return float(weights.sum()) ** 2 / square_sum if square_sum > 0 else 0.0
+
+
+# Eventos: recebem um BatchResult e retornam um array booleano por partida
+
+def player_death(result):
+    return result.player_hp == 0
+
+
+def victory(result):
+    return result.victory
+
+
+def low_hp_arrival(max_player_hp):
+    """Chegou à sala de parada (use com `stop_room`) com HP <= `max_player_hp`"""
+    return lambda result: (result.player_hp > 0) & (result.player_hp <= max_player_hp)
+
+
+def estimate_probability(weapons, monsters, event, n=100_000, player_tilt=0.0, monster_tilt=0.0,
+                         seed=None, max_hp=100, chunk=200_000, **start):
+    """Estima P(evento) por amostragem por importância
+
+    As partidas são simuladas com as distribuições de dano inclinadas
+    (`player_tilt` < 0 enfraquece as armas, `monster_tilt` > 0 fortalece os
+    monstros) e cada uma é reponderada pela razão de verossimilhança
+    acumulada, o que mantém o estimador não viesado. Com as duas inclinações
+    em zero é Monte Carlo comum. `start` repassa o estado inicial para
+    `run_batch` (start_room, player_hp, monster_hp, turn_count, stop_room).
+    """
+    model = CombatModel(weapons, monsters, max_hp, player_tilt=player_tilt, monster_tilt=monster_tilt)
+    rng = np.random.default_rng(seed)
+    indicators, log_weights = [], []
+    for done in range(0, n, chunk):
+        size = min(chunk, n - done)
+        result = run_batch(model, size, numpy_uniforms(rng, size), **start)
+        indicators.append(event(result))
+        log_weights.append(result.log_weight)
+    return RareEventEstimate.from_weights(np.concatenate(indicators), np.concatenate(log_weights),
+                                          player_tilt, monster_tilt)
+
+
+def tune_tilts(weapons, monsters, event, player_tilts=(0.0, -0.1, -0.2, -0.3),
+               monster_tilts=(0.0, 0.1, 0.2, 0.3, 0.4), pilot=20_000, seed=None, max_hp=100, **start):
+    """Escolhe o par de inclinações com menor variância por amostra em corridas piloto
+
+    Retorna (player_tilt, monster_tilt, estimativas piloto). Pares sem
+    nenhum acerto ou com ESS muito baixo são descartados.
+    """
+    rng = np.random.default_rng(seed)
+    pilots = []
+    best, best_score = (0.0, 0.0), math.inf
+    for pt in player_tilts:
+        for mt in monster_tilts:
+            estimate = estimate_probability(weapons, monsters, event, pilot, pt, mt,
+                                            seed=int(rng.integers(2 ** 63)), max_hp=max_hp, **start)
+            pilots.append(estimate)
+            if estimate.hits < 10 or estimate.ess < 5:
+                continue
+            score = estimate.relative_error
+            if score < best_score:
+                best, best_score = (pt, mt), score
+    return best[0], best[1], pilots
+
+
+def estimate_by_splitting(weapons, monsters, event=victory, n=100_000, tilts=(0.0, 0.0), replicas=10,
+                          seed=None, max_hp=100, start_room=0, player_hp=None, stop_room=None):
+    """Estima P(evento) com splitting por sala + amostragem por importância
+
+    O caminho é quebrado nas fronteiras de sala: cada estágio simula `n`
+    partidas até a próxima sala (com as inclinações do estágio) e as que
+    sobreviveram são reamostradas em proporção ao peso para recomeçar o
+    estágio seguinte. A probabilidade é o produto das probabilidades
+    condicionais. Trajetos curtos mantêm os pesos bem comportados, o que
+    permite chegar a eventos de 1e-6 ou menos. Vale para eventos que exigem
+    sobreviver até `stop_room` (vitória, chegada com pouco HP).
+
+    `tilts` é um par (player_tilt, monster_tilt) para todos os estágios ou
+    uma lista com um par por estágio. O erro padrão vem de `replicas`
+    execuções independentes.
+    """
+    stop_room = len(monsters) if stop_room is None else stop_room
+    stages = range(start_room, stop_room)
+    if np.ndim(tilts) == 1:
+        tilts = [tilts] * len(stages)
+    models = [CombatModel(weapons, monsters, max_hp, player_tilt=pt, monster_tilt=mt) for pt, mt in tilts]
+    rng = np.random.default_rng(seed)
+
+    products, hits, ess = [], 0, 0.0
+    for _ in range(replicas):
+        php = np.full(n, max_hp if player_hp is None else player_hp, dtype=np.int64)
+        product, stage_ess = 1.0, float(n)
+        for model, room in zip(models, stages):
+            result = run_batch(model, n, numpy_uniforms(rng, n), start_room=room, player_hp=php,
+                               stop_room=room + 1)
+            final = room + 1 == stop_room
+            reached = event(result) if final else result.player_hp > 0
+            weights = np.where(reached, np.exp(result.log_weight), 0.0)
+            product *= weights.mean()
+            stage_ess = min(stage_ess, _kish_ess(weights))
+            if final:
+                hits += int(np.count_nonzero(reached))
+            if product == 0.0:
+                break
+            if not final:
+                php = result.player_hp[rng.choice(n, n, p=weights / weights.sum())]
+        products.append(product)
+        ess += stage_ess
+
+    return RareEventEstimate(products, hits, ess, n=n * len(stages) * replicas)
+
+
+if __name__ == "__main__":
+    import time
+    from advisor import solve
+    from monsters import MONSTERS
+    from weapons import WEAPONS
+
+    print("🎯 TESTANDO EVENTOS RAROS (AMOSTRAGEM POR IMPORTÂNCIA)\n")
+
+    # Referência exata: iteração de valor com a arma sorteada (modo normal)
+    _, exact = solve(WEAPONS, MONSTERS, average=True)
+
+    print(f"Vencer o chefe com 5 HP (exato: {exact[5, 5, 150, 0]:.3e})")
+    start = dict(start_room=5, player_hp=5)
+    pt, mt, _ = tune_tilts(WEAPONS, MONSTERS, victory, player_tilts=(0.0, 0.1, 0.2),
+                           monster_tilts=(0.0, -0.1, -0.2, -0.3), seed=1, **start)
+    t0 = time.perf_counter()
+    plain = estimate_probability(WEAPONS, MONSTERS, victory, 1_000_000, seed=2, **start)
+    t1 = time.perf_counter()
+    tilted = estimate_probability(WEAPONS, MONSTERS, victory, 1_000_000, pt, mt, seed=3, **start)
+    t2 = time.perf_counter()
+    print(f"  Monte Carlo : {plain} ({t1 - t0:.1f}s)")
+    print(f"  Importancia : {tilted} ({t2 - t1:.1f}s, inclinacoes {pt:+.1f}/{mt:+.1f})")
+    print(f"  Reducao de variancia: {plain.variance / tilted.variance:.0f}x")
+
+    print(f"\nVencer as 2 ultimas salas com 6 HP (exato: {exact[4, 6, 80, 0]:.3e})")
+    start = dict(start_room=4, player_hp=6)
+    t0 = time.perf_counter()
+    plain = estimate_probability(WEAPONS, MONSTERS, victory, 1_000_000, seed=4, **start)
+    t1 = time.perf_counter()
+    split = estimate_by_splitting(WEAPONS, MONSTERS, victory, 100_000, tilts=(0.1, -0.3), seed=5, **start)
+    t2 = time.perf_counter()
+    print(f"  Monte Carlo : {plain} ({t1 - t0:.1f}s)")
+    print(f"  Splitting+IS: {split} ({t2 - t1:.1f}s)")
+
+    print("\n✅ Módulo funcionando corretamente!")
@@ -0,0 +1,219 @@
+import argparse
+import asyncio
+import json
+import secrets
+import time
+from collections import OrderedDict
+
+from monsters import load_monsters
+from session import GameSession
+from sketches import StatsCollector
+from weapons import WEAPONS, load_weapons
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+class SessionManager:
+    """Guarda as sessões ativas, com limite de quantidade e de inatividade
+
+    Quando o limite é atingido, a sessão usada há mais tempo é descartada;
+    junto com o `history_limit` de cada sessão isso mantém a memória do
+    processo limitada.
+    """
+
+    def __init__(self, max_sessions=10_000, idle_timeout=900.0, history_limit=64, on_remove=None,
+                 weapons=None, monsters=None):
+        self.max_sessions = max_sessions
+        self.weapons = WEAPONS if weapons is None else weapons
+        self.monsters = monsters
+        self.idle_timeout = idle_timeout
+        self.history_limit = history_limit
+        self.on_remove = on_remove
+        self.sessions = OrderedDict()  # id -> (sessão, último acesso)
+
+    def _removed(self, session_id, session):
+        if self.on_remove is not None:
+            self.on_remove(session_id, session)
+
+    def create(self, seed=None):
+        while len(self.sessions) >= self.max_sessions:
+            self._removed(*self._pop_oldest())
+        session_id = secrets.token_hex(8)
+        session = GameSession(self.weapons, self.monsters, seed=seed, history_limit=self.history_limit)
+        self.sessions[session_id] = (session, time.monotonic())
+        return session_id, session
+
+    def get(self, session_id):
+        entry = self.sessions.get(session_id)
+        if entry is None:
+            raise KeyError(f"Sessao desconhecida: {session_id}")
+        self.sessions[session_id] = (entry[0], time.monotonic())
+        self.sessions.move_to_end(session_id)
+        return entry[0]
+
+    def _pop_oldest(self):
+        session_id, (session, _) = self.sessions.popitem(last=False)
+        return session_id, session
+
+    def close(self, session_id):
+        entry = self.sessions.pop(session_id, None)
+        if entry is None:
+            return False
+        self._removed(session_id, entry[0])
+        return True
+
+    def evict_idle(self):
+        """Remove sessões inativas; retorna quantas foram removidas"""
+        limit = time.monotonic() - self.idle_timeout
+        removed = 0
+        while self.sessions:
+            _, (_, last_seen) = next(iter(self.sessions.items()))
+            if last_seen >= limit:
+                break
+            self._removed(*self._pop_oldest())
+            removed += 1
+        return removed
+
+
+class GameServer:
+    """Servidor asyncio de partidas sem interface (protocolo JSON por linha)
+
+    Cada linha recebida é um objeto JSON com o campo "op":
+        {"op": "new", "seed": 42}                  -> cria uma sessão
+        {"op": "attack", "session": id, "weapon": 2} -> um turno (arma opcional)
+        {"op": "state", "session": id}             -> estado da partida
+        {"op": "stats", "session": id}             -> estatísticas
+        {"op": "close", "session": id}             -> encerra a sessão
+        {"op": "global_stats"}                     -> estatísticas de todas as sessões
+        {"op": "report", "sketch": {...}}          -> mescla um resumo externo
+    A resposta é uma linha JSON com "ok" e os dados (ou "error").
+
+    As estatísticas globais são mantidas por um `StatsCollector`: as sessões
+    com ataques novos enviam seus resumos a cada `stats_interval` segundos
+    (e ao serem encerradas), sem nunca expor o histórico bruto.
+    """
+
+    def __init__(self, manager=None, stats_interval=1.0):
+        self.manager = manager or SessionManager()
+        self.manager.on_remove = self._flush_session
+        self.collector = StatsCollector(self.manager.weapons)
+        self.stats_interval = stats_interval
+        self.dirty = set()
+        self.server = None
+
+    def _flush_session(self, session_id, session):
+        self.dirty.discard(session_id)
+        sketch = session.emit_stats()
+        if sketch.n:
+            self.collector.merge(sketch)
+
+    def flush_stats(self):
+        """Mescla no coletor os resumos das sessões com ataques novos"""
+        for session_id in list(self.dirty):
+            entry = self.manager.sessions.get(session_id)
+            if entry is not None:
+                self._flush_session(session_id, entry[0])
+        self.dirty.clear()
+
+    def dispatch(self, request):
+        if not isinstance(request, dict):
+            raise ValueError("Requisicao deve ser um objeto JSON")
+        op = request.get("op")
+        if op == "new":
+            session_id, session = self.manager.create(request.get("seed"))
+            return {"ok": True, "session": session_id, "state": session.state()}
+        if op == "ping":
+            return {"ok": True, "sessions": len(self.manager.sessions)}
+        if op == "global_stats":
+            self.flush_stats()
+            return {"ok": True, "stats": self.collector.snapshot()}
+        if op == "report":
+            self.collector.merge(request["sketch"])
+            return {"ok": True}
+
+        session_id = request.get("session")
+        if op == "close":
+            return {"ok": self.manager.close(session_id)}
+
+        session = self.manager.get(session_id)
+        if op == "attack":
+            weapon = request.get("weapon")
+            if weapon is not None and not 0 <= weapon < len(session.weapons):
+                raise ValueError(f"Arma invalida: {weapon}")
+            weapon_idx = session.attack(weapon)
+            session.events.flush()  # sem quadros aqui: entrega o turno na hora
+            self.dirty.add(session_id)
+            return {"ok": True, "weapon": weapon_idx, "state": session.state()}
+        if op == "state":
+            return {"ok": True, "state": session.state()}
+        if op == "stats":
+            return {"ok": True, "stats": session.stats()}
+        raise ValueError(f"Operacao desconhecida: {op!r}")
+
+    async def handle_client(self, reader, writer):
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except ValueError:
+                    # Linha acima do limite do leitor: responde e encerra a conexão
+                    # (o restante da linha não pode ser separado da próxima requisição)
+                    writer.write(json.dumps({"ok": False, "error": "Requisicao longa demais"}).encode() + b"\n")
+                    await writer.drain()
+                    break
+                if not line:
+                    break
+                try:
+                    response = self.dispatch(json.loads(line))
+                except (ValueError, KeyError, TypeError) as exc:
+                    response = {"ok": False, "error": str(exc)}
+                writer.write(json.dumps(response).encode() + b"\n")
+                await writer.drain()
+        except (ConnectionResetError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def _evict_loop(self, interval):
+        while True:
+            await asyncio.sleep(interval)
+            self.manager.evict_idle()
+
+    async def _stats_loop(self):
+        while True:
+            await asyncio.sleep(self.stats_interval)
+            self.flush_stats()
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle_client, host, port, backlog=4096)
+        loop = asyncio.get_running_loop()
+        loop.create_task(self._evict_loop(60.0))
+        loop.create_task(self._stats_loop())
+        return self.server
+
+    async def serve_forever(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        server = await self.start(host, port)
+        async with server:
+            await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor multi-sessao do Fate's Gambit")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-sessions", type=int, default=10_000)
+    parser.add_argument("--history-limit", type=int, default=64)
+    parser.add_argument("--weapons", metavar="ARQUIVO", help="armas de um arquivo JSON/TOML proprio")
+    parser.add_argument("--monsters", metavar="ARQUIVO", help="monstros de um arquivo JSON/TOML proprio")
+    args = parser.parse_args()
+
+    manager = SessionManager(max_sessions=args.max_sessions, history_limit=args.history_limit,
+                             weapons=load_weapons(args.weapons) if args.weapons else None,
+                             monsters=load_monsters(args.monsters) if args.monsters else None)
+    print(f"Servidor ouvindo em {args.host}:{args.port} (ate {args.max_sessions} sessoes)")
+    try:
+        asyncio.run(GameServer(manager).serve_forever(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
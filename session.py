@@ -0,0 +1,197 @@
+import copy
+import random
+from collections import deque
+
+import numpy as np
+
+from events import EventBus
+from gof import GoodnessOfFit
+from monsters import MONSTERS
+from sketches import SessionSketch
+from weapons import WEAPONS
+
+
+class GameSession:
+    """Estado completo de uma partida, sem pygame e sem estado global mutável
+
+    Armas são compartilhadas (somente leitura); cada sessão tem suas próprias
+    cópias dos monstros e seu próprio gerador aleatório. Com `history_limit`
+    o histórico de dano fica limitado, mantendo a memória por sessão
+    constante (as estatísticas usam apenas vetores de contagem).
+
+    Cada turno publica eventos em `self.events`; históricos e acumuladores
+    de estatísticas são assinantes que recebem os ataques em lotes, na
+    próxima chamada de `events.flush()` (feita por `stats()` e
+    `emit_stats()`, e pelo jogo uma vez por quadro).
+    """
+
+    def __init__(self, weapons=None, monsters=None, seed=None, max_hp=100, history_limit=None):
+        self.weapons = WEAPONS if weapons is None else weapons
+        self.monster_templates = MONSTERS if monsters is None else monsters
+        self.rng = random.Random(seed)
+        self.history_limit = history_limit
+        self.max_hp = max_hp
+        self.events = EventBus()
+        self.events.subscribe(self._record_attacks)
+        self.reset()
+
+    def reset(self):
+        """Recomeça a partida do zero (o gerador aleatório segue a sequência)"""
+        self.events.flush()
+        self.damage_history = self._new_history()
+        self.fits = {idx: GoodnessOfFit(w.pmf, w.min_damage) for idx, w in enumerate(self.weapons)}
+        self.sketch = SessionSketch(self.weapons)
+        self.critical_hits = 0
+        self.total_attacks = 0
+        self.total_damage = 0
+        self.new_run()
+
+    def new_run(self):
+        """Nova masmorra (HP, salas e monstros), mantendo as estatísticas"""
+        self.monsters = [copy.copy(m) for m in self.monster_templates]
+        self.player_hp = self.max_hp
+        self.current_room = 0
+        self.current_monster = None
+        self.turn = 0
+        self.game_over = False
+        self.victory = False
+        self.last_player_damage = None
+        self.last_monster_damage = None
+        self.last_weapon_used = None
+
+        self.start_room()
+
+    def _record_attacks(self, batch):
+        """Assinante: histórico e acumuladores de estatísticas, por lote"""
+        if len(batch) == 1:
+            # Um ataque por requisição (servidor): atualizações O(1), sem bincount
+            idx, damage, critical = int(batch.weapon[0]), int(batch.damage[0]), bool(batch.critical[0])
+            self.damage_history.append(damage)
+            self.fits[idx].update(damage)
+            self.sketch.update(idx, damage, critical)
+            self.critical_hits += critical
+            return
+        self.damage_history.extend(batch.damage.tolist())
+        for idx in np.unique(batch.weapon):
+            self.fits[int(idx)].update_many(batch.damage[batch.weapon == idx])
+        self.sketch.update_many(batch.weapon, batch.damage, batch.critical)
+        self.critical_hits += int(np.count_nonzero(batch.critical))
+
+    def _new_history(self):
+        if self.history_limit is None:
+            return []
+        return deque(maxlen=self.history_limit)
+
+    def start_room(self):
+        if self.current_room >= len(self.monsters):
+            self.victory = True
+            return
+        self.current_monster = self.monsters[self.current_room]
+        self.current_monster.reset()
+        self.events.room("enter", self.current_room)
+
+    def is_finished(self):
+        return self.game_over or self.victory
+
+    def attack(self, weapon_idx=None):
+        """Executa um turno (jogador ataca, monstro contra-ataca)
+
+        Sem `weapon_idx` a arma é sorteada uniformemente. Retorna o índice da
+        arma usada, ou None se não havia monstro para atacar.
+        """
+        if not self.current_monster or not self.current_monster.is_alive():
+            return None
+
+        if weapon_idx is None:
+            weapon_idx = self.rng.randrange(len(self.weapons))
+        weapon = self.weapons[weapon_idx]
+        self.last_weapon_used = weapon
+
+        # Ataque do jogador
+        damage, is_critical = weapon.roll(self.rng)
+        self.current_monster.take_damage(damage)
+
+        self.total_attacks += 1
+        self.total_damage += damage
+        self.turn += 1
+        self.last_player_damage = (damage, is_critical)
+
+        if not self.current_monster.is_alive():
+            self.events.attack(weapon_idx, damage, is_critical, -1, False, self.current_room, self.player_hp)
+            self.events.room("clear", self.current_room)
+            self.current_room += 1
+            self.last_monster_damage = None
+            if self.current_room < len(self.monsters):
+                self.start_room()
+            else:
+                self.victory = True
+                self.events.room("victory", self.current_room - 1)
+            return weapon_idx
+
+        monster_damage, is_special = self.current_monster.attack(self.rng)
+        self.player_hp -= monster_damage
+        self.last_monster_damage = (monster_damage, is_special)
+
+        if self.player_hp <= 0:
+            self.player_hp = 0
+            self.game_over = True
+        self.events.attack(weapon_idx, damage, is_critical, monster_damage, is_special,
+                           self.current_room, self.player_hp)
+        if self.game_over:
+            self.events.room("death", self.current_room)
+        return weapon_idx
+
+    def emit_stats(self):
+        """Resumo mesclável dos ataques desde o último envio (zera o acumulador)"""
+        self.events.flush()
+        sketch, self.sketch = self.sketch, SessionSketch(self.weapons)
+        return sketch
+
+    def state(self):
+        """Estado atual da partida (serializável em JSON)"""
+        monster = self.current_monster
+        return {
+            "player_hp": self.player_hp,
+            "max_hp": self.max_hp,
+            "room": self.current_room,
+            "rooms": len(self.monsters),
+            "monster": None if monster is None else {
+                "name": monster.name,
+                "hp": monster.current_hp,
+                "max_hp": monster.max_hp,
+                "is_boss": monster.is_boss,
+                "turn_count": monster.turn_count,
+            },
+            "turn": self.turn,
+            "game_over": self.game_over,
+            "victory": self.victory,
+            "last_weapon": None if self.last_weapon_used is None else self.last_weapon_used.name,
+            "last_player_damage": self.last_player_damage,
+            "last_monster_damage": self.last_monster_damage,
+        }
+
+    def stats(self):
+        """Estatísticas da partida (serializáveis em JSON)"""
+        self.events.flush()
+        weapons = []
+        for idx, fit in self.fits.items():
+            if fit.n == 0:
+                continue
+            summary = fit.summary()
+            weapons.append({
+                "weapon": idx,
+                "name": self.weapons[idx].name,
+                "uses": fit.n,
+                "mean": fit.mean(),
+                "expected": self.weapons[idx].avg_damage,
+                "chi2_p": summary["chi2_p"],
+                "g_p": summary["g_p"],
+                "ks_p": summary["ks_p"],
+            })
+        return {
+            "total_attacks": self.total_attacks,
+            "total_damage": self.total_damage,
+            "mean_damage": self.total_damage / self.total_attacks if self.total_attacks else 0.0,
+            "critical_hits": self.critical_hits,
+            "weapons": weapons,
+        }
@@ -0,0 +1,194 @@
+import numpy as np
+
+from advisor import monster_attack_pmfs
+
+
+def tilt_pmf(pmf, offset, theta):
+    """Inclinação exponencial: p_theta(x) = p(x) e^(theta x) / M(theta)
+
+    Retorna (pmf inclinada, log da razão de verossimilhança log p/p_theta por
+    valor), usada para reponderar amostras sorteadas da distribuição inclinada.
+    """
+    pmf = np.asarray(pmf, dtype=float)
+    if theta == 0:
+        return pmf, np.zeros(len(pmf))
+    values = np.arange(offset, offset + len(pmf))
+    logits = np.where(pmf > 0, np.log(np.where(pmf > 0, pmf, 1.0)) + theta * values, -np.inf)
+    shift = logits.max()
+    weights = np.exp(logits - shift)
+    log_mgf = shift + np.log(weights.sum())
+    return weights / weights.sum(), log_mgf - theta * values
+
+
+class _SamplingTable:
+    """Várias distribuições discretas numa única CDF "empilhada"
+
+    A CDF da linha i é deslocada para o intervalo [i, i + 1], o que deixa o
+    vetor inteiro ordenado: um único `searchsorted` sorteia por inversão
+    para todas as linhas ao mesmo tempo.
+    """
+
+    def __init__(self, pmfs, offsets, log_ratios=None):
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.starts = np.zeros(len(pmfs), dtype=np.int64)
+        stacked, ratios, means = [], [], []
+        position = 0
+        for row, pmf in enumerate(pmfs):
+            cdf = np.cumsum(pmf)
+            cdf[-1] = 1.0
+            self.starts[row] = position
+            stacked.append(cdf + row)
+            ratios.append(np.zeros(len(pmf)) if log_ratios is None else log_ratios[row])
+            means.append(float(np.dot(np.arange(offsets[row], offsets[row] + len(pmf)), pmf)))
+            position += len(pmf)
+        self.cdf = np.concatenate(stacked)
+        self.log_ratio = np.concatenate(ratios)
+        self.means = np.array(means)  # média de cada linha sob a distribuição sorteada
+
+    def sample(self, rows, u):
+        """Sorteia um valor por linha; retorna (valores, log-razões)"""
+        flat = np.searchsorted(self.cdf, u + rows, side="right")
+        return self.offsets[rows] + (flat - self.starts[rows]), self.log_ratio[flat]
+
+
+class CombatModel:
+    """Armas e monstros convertidos em tabelas numéricas para simulação em lote
+
+    `player_tilt` / `monster_tilt` inclinam exponencialmente as distribuições
+    de dano (amostragem por importância); os pesos de verossimilhança de
+    cada sorteio ficam nas tabelas.
+    """
+
+    def __init__(self, weapons, monsters, max_hp=100, player_tilt=0.0, monster_tilt=0.0, monster_hp=None):
+        self.max_hp = max_hp
+        self.n_weapons = len(weapons)
+        self.n_rooms = len(monsters)
+        self.player_tilt = player_tilt
+        self.monster_tilt = monster_tilt
+        self.monster_hp = np.array(monster_hp if monster_hp is not None else [m.max_hp for m in monsters],
+                                   dtype=np.int64)
+        self.is_boss = np.array([m.is_boss for m in monsters])
+
+        pmfs, offsets, ratios = [], [], []
+        for w in weapons:
+            pmf, ratio = tilt_pmf(w.pmf, w.min_damage, player_tilt)
+            pmfs.append(pmf)
+            offsets.append(w.min_damage)
+            ratios.append(ratio)
+        self.weapons = _SamplingTable(pmfs, offsets, ratios)
+        if player_tilt == 0:
+            # Sem inclinação a variável de controle usa a média exata da arma
+            self.weapons.means = np.array([w.avg_damage for w in weapons])
+        # O uniforme da escolha de arma percorre as armas da mais fraca para a
+        # mais forte: a escolha continua uniforme, mas fica monótona no dano
+        # (u e 1 - u escolhem armas opostas nas variáveis antitéticas)
+        self.weapon_order = np.argsort(self.weapons.means, kind="stable")
+
+        # Linha 2 * sala + especial
+        pmfs, offsets, ratios = [], [], []
+        for m in monsters:
+            attack = monster_attack_pmfs(m)
+            for pmf in (attack[0], attack[2]):
+                tilted, ratio = tilt_pmf(pmf, 0, monster_tilt)
+                pmfs.append(tilted)
+                offsets.append(0)
+                ratios.append(ratio)
+        self.monsters = _SamplingTable(pmfs, offsets, ratios)
+
+    def variant(self, monster_hp=None, max_hp=None):
+        """Cópia com outro HP dos monstros e/ou do jogador (variantes de balanceamento)"""
+        clone = object.__new__(CombatModel)
+        clone.__dict__.update(self.__dict__)
+        if monster_hp is not None:
+            clone.monster_hp = np.asarray(monster_hp, dtype=np.int64)
+        if max_hp is not None:
+            clone.max_hp = max_hp
+        return clone
+
+
+class BatchResult:
+    """Resultado de um lote de partidas simuladas (um elemento por partida)"""
+
+    def __init__(self, n):
+        self.victory = np.zeros(n, dtype=bool)
+        self.rooms_cleared = np.zeros(n, dtype=np.int64)
+        self.attacks = np.zeros(n, dtype=np.int64)
+        self.player_hp = np.zeros(n, dtype=np.int64)
+        self.log_weight = np.zeros(n)
+        # Variáveis de controle (média conhecida = 0): soma de (dano - média
+        # da distribuição) dos ataques do jogador e dos contra-ataques
+        self.player_luck = np.zeros(n)
+        self.monster_luck = np.zeros(n)
+
+    @property
+    def weight(self):
+        return np.exp(self.log_weight)
+
+
+def numpy_uniforms(rng, n):
+    """Fonte de uniformes: a cada passo, um bloco (3, n) independente"""
+    return lambda step: rng.random((3, n))
+
+
+def run_batch(model, n, uniforms, start_room=0, player_hp=None, monster_hp=None, turn_count=0,
+              stop_room=None, max_steps=100_000):
+    """Simula `n` partidas em paralelo (vetorizado por partida)
+
+    Com `stop_room` a partida é interrompida ao chegar nessa sala (o HP do
+    jogador na chegada fica em `player_hp`); por padrão vai até o fim.
+
+    `uniforms(step)` devolve um array (3, n): arma, dano do jogador e dano
+    do monstro de cada partida naquele turno. Como toda a aleatoriedade passa
+    por esses uniformes (inversão da CDF), a mesma fonte reproduz as mesmas
+    partidas - base para números aleatórios comuns e variáveis antitéticas.
+    """
+    result = BatchResult(n)
+    room = np.full(n, start_room, dtype=np.int64)
+    php = np.full(n, model.max_hp if player_hp is None else player_hp, dtype=np.int64)
+    mhp = np.full(n, model.monster_hp[start_room] if monster_hp is None else monster_hp, dtype=np.int64)
+    turn = np.full(n, turn_count, dtype=np.int64)
+    active = np.ones(n, dtype=bool)
+    stop_room = model.n_rooms if stop_room is None else stop_room
+
+    for step in range(max_steps):
+        lanes = np.flatnonzero(active)
+        if len(lanes) == 0:
+            break
+        u = uniforms(step)[:, lanes]
+
+        # Ataque do jogador (arma sorteada uniformemente)
+        weapon = model.weapon_order[np.minimum((u[0] * model.n_weapons).astype(np.int64), model.n_weapons - 1)]
+        damage, log_ratio = model.weapons.sample(weapon, u[1])
+        result.log_weight[lanes] += log_ratio
+        result.player_luck[lanes] += damage - model.weapons.means[weapon]
+        result.attacks[lanes] += 1
+        mhp[lanes] -= damage
+
+        killed = mhp[lanes] <= 0
+        if killed.any():
+            k = lanes[killed]
+            room[k] += 1
+            result.rooms_cleared[k] += 1
+            result.victory[k] = room[k] >= model.n_rooms
+            stopped = room[k] >= stop_room
+            active[k[stopped]] = False
+            nxt = k[~stopped]
+            mhp[nxt] = model.monster_hp[room[nxt]]
+            turn[nxt] = 0
+
+        # Contra-ataque (o chefe usa o especial a cada 3 turnos)
+        alive = ~killed
+        lanes, u2 = lanes[alive], u[2][alive]
+        turn[lanes] += 1
+        special = model.is_boss[room[lanes]] & (turn[lanes] % 3 == 0)
+        rows = 2 * room[lanes] + special
+        damage, log_ratio = model.monsters.sample(rows, u2)
+        result.log_weight[lanes] += log_ratio
+        result.monster_luck[lanes] += damage - model.monsters.means[rows]
+        php[lanes] -= damage
+        dead = lanes[php[lanes] <= 0]
+        php[dead] = 0
+        active[dead] = False
+
+    result.player_hp = php
+    return result
@@ -0,0 +1,278 @@
+import numpy as np
+
+
+class DamageSketch:
+    """Resumo mesclável da distribuição de dano de uma arma
+
+    Guarda um vetor de contagens por valor de dano (que funciona como um
+    "sketch" de quantis exato, já que o dano é inteiro e limitado), média e
+    M2 pelo algoritmo de Welford e a contagem de críticos. Dois resumos são
+    combinados em O(valores possíveis) pela fórmula paralela de Chan.
+    """
+
+    def __init__(self, offset=0, size=0):
+        self.offset = offset
+        self.counts = np.zeros(size, dtype=np.int64)
+        self.n = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.crits = 0
+
+    def update(self, value, is_critical=False):
+        i = value - self.offset
+        if not 0 <= i < len(self.counts):
+            self._extend(value, value)
+            i = value - self.offset
+        self.counts[i] += 1
+        self.n += 1
+        delta = value - self.mean
+        self.mean += delta / self.n
+        self.m2 += delta * (value - self.mean)
+        if is_critical:
+            self.crits += 1
+
+    def update_many(self, values, criticals=None):
+        """Registra um lote de valores (vetorizado: resumo do lote + mesclagem)"""
+        values = np.asarray(values, dtype=np.int64)
+        if len(values) == 0:
+            return
+        batch = DamageSketch(int(values.min()))
+        batch.counts = np.bincount(values - batch.offset)
+        batch.n = len(values)
+        batch.mean = float(values.mean())
+        batch.m2 = float(((values - batch.mean) ** 2).sum())
+        batch.crits = 0 if criticals is None else int(np.count_nonzero(criticals))
+        self.merge(batch)
+
+    def _extend(self, low, high):
+        """Aumenta o vetor de contagens para cobrir [low, high]"""
+        if len(self.counts):
+            low = min(low, self.offset)
+            high = max(high, self.offset + len(self.counts) - 1)
+        counts = np.zeros(high - low + 1, dtype=np.int64)
+        start = self.offset - low
+        counts[start:start + len(self.counts)] = self.counts
+        self.offset = low
+        self.counts = counts
+
+    def merge(self, other):
+        """Incorpora outro resumo (in-place)"""
+        if other.n == 0:
+            return self
+        low, high = other.offset, other.offset + len(other.counts) - 1
+        if not len(self.counts) or low < self.offset or high >= self.offset + len(self.counts):
+            self._extend(low, high)
+        start = other.offset - self.offset
+        self.counts[start:start + len(other.counts)] += other.counts
+
+        n = self.n + other.n
+        delta = other.mean - self.mean
+        self.mean += delta * other.n / n
+        self.m2 += other.m2 + delta ** 2 * self.n * other.n / n
+        self.n = n
+        self.crits += other.crits
+        return self
+
+    @property
+    def variance(self):
+        return self.m2 / (self.n - 1) if self.n > 1 else 0.0
+
+    @property
+    def crit_rate(self):
+        return self.crits / self.n if self.n else 0.0
+
+    def quantile(self, q):
+        """Quantil q (0..1) a partir das contagens"""
+        if self.n == 0:
+            return None
+        cumulative = np.cumsum(self.counts)
+        i = int(np.searchsorted(cumulative, q * self.n, side="left"))
+        return self.offset + min(i, len(self.counts) - 1)
+
+    def histogram(self):
+        """Retorna {dano: contagem} (apenas valores observados)"""
+        return {self.offset + int(i): int(c) for i, c in enumerate(self.counts) if c}
+
+    def to_dict(self):
+        return {"offset": self.offset, "counts": self.counts.tolist(), "n": self.n,
+                "mean": self.mean, "m2": self.m2, "crits": self.crits}
+
+    @classmethod
+    def from_counts(cls, offset, counts, crits=0):
+        """Resumo reconstruído só a partir das contagens (n e momentos recalculados)"""
+        sketch = cls(offset)
+        sketch.counts = np.asarray(counts, dtype=np.int64)
+        sketch.n = int(sketch.counts.sum())
+        if sketch.n:
+            values = np.arange(offset, offset + len(sketch.counts))
+            sketch.mean = float(np.dot(values, sketch.counts) / sketch.n)
+            sketch.m2 = float(np.dot((values - sketch.mean) ** 2, sketch.counts))
+        sketch.crits = crits
+        return sketch
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls(data["offset"])
+        sketch.counts = np.asarray(data["counts"], dtype=np.int64)
+        sketch.n = data["n"]
+        sketch.mean = data["mean"]
+        sketch.m2 = data["m2"]
+        sketch.crits = data["crits"]
+        return sketch
+
+
+class SessionSketch:
+    """Resumos por arma de uma sessão (ou de várias, depois de mesclados)"""
+
+    def __init__(self, weapons=()):
+        self.weapons = {idx: DamageSketch(w.min_damage, len(w.pmf)) for idx, w in enumerate(weapons)}
+
+    def update(self, weapon_idx, damage, is_critical=False):
+        self.weapons[weapon_idx].update(damage, is_critical)
+
+    def update_many(self, weapon_idx, damages, criticals):
+        """Lote de ataques (arrays alinhados), agrupado por arma"""
+        for idx in np.unique(weapon_idx):
+            mask = weapon_idx == idx
+            self.weapons[int(idx)].update_many(damages[mask], criticals[mask])
+
+    def merge(self, other):
+        for idx, sketch in other.weapons.items():
+            if idx in self.weapons:
+                self.weapons[idx].merge(sketch)
+            else:
+                self.weapons[idx] = DamageSketch().merge(sketch)
+        return self
+
+    @property
+    def n(self):
+        return sum(s.n for s in self.weapons.values())
+
+    def to_dict(self):
+        return {str(idx): s.to_dict() for idx, s in self.weapons.items() if s.n}
+
+    @classmethod
+    def from_dict(cls, data):
+        sketch = cls()
+        sketch.weapons = {int(idx): DamageSketch.from_dict(s) for idx, s in data.items()}
+        return sketch
+
+
+class StatsCollector:
+    """Agrega estatísticas de dano de muitas sessões em tempo real
+
+    As sessões enviam apenas resumos (`SessionSketch.to_dict()`), nunca o
+    histórico bruto; cada mesclagem custa O(armas x faixa de dano).
+    """
+
+    def __init__(self, weapons):
+        self.weapons = weapons
+        self.total = SessionSketch(weapons)
+        self.reports = 0
+
+    def merge(self, payload):
+        """Mescla um resumo (SessionSketch ou dicionário vindo da rede, validado)"""
+        sketch = payload if isinstance(payload, SessionSketch) else self.parse_report(payload)
+        self.total.merge(sketch)
+        self.reports += 1
+
+    def parse_report(self, data):
+        """Valida um resumo vindo da rede e o converte em SessionSketch
+
+        Cada arma precisa existir e as contagens precisam caber na faixa de
+        dano dela; n, média e M2 são recalculados a partir das contagens, de
+        modo que valores inconsistentes do cliente nunca chegam ao total.
+        Levanta ValueError para qualquer resumo inválido.
+        """
+        if not isinstance(data, dict):
+            raise ValueError("Resumo deve ser um objeto {arma: resumo}")
+        sketch = SessionSketch()
+        for key, entry in data.items():
+            try:
+                idx = int(key)
+            except (TypeError, ValueError):
+                raise ValueError(f"Indice de arma invalido: {key!r}") from None
+            if not 0 <= idx < len(self.weapons):
+                raise ValueError(f"Arma inexistente: {idx}")
+            if not isinstance(entry, dict):
+                raise ValueError(f"Resumo da arma {idx} deve ser um objeto")
+            weapon = self.weapons[idx]
+            offset, counts, crits = entry.get("offset"), entry.get("counts"), entry.get("crits", 0)
+            if type(offset) is not int or type(crits) is not int or not isinstance(counts, list):
+                raise ValueError(f"Resumo da arma {idx}: offset/crits inteiros e counts lista")
+            counts = np.array(counts)
+            if counts.ndim != 1 or (len(counts) and counts.dtype.kind not in "iu") or np.any(counts < 0):
+                raise ValueError(f"Resumo da arma {idx}: contagens devem ser inteiros >= 0")
+            if offset < weapon.min_damage or offset + len(counts) - 1 > weapon.max_damage:
+                raise ValueError(f"Resumo da arma {idx}: danos fora de "
+                                 f"[{weapon.min_damage}, {weapon.max_damage}]")
+            n = int(counts.sum())
+            if not 0 <= crits <= n:
+                raise ValueError(f"Resumo da arma {idx}: criticos fora de [0, {n}]")
+            sketch.weapons[idx] = DamageSketch.from_counts(offset, counts, crits)
+        return sketch
+
+    def snapshot(self):
+        """Estatísticas globais por arma (serializáveis em JSON)"""
+        weapons = []
+        for idx, sketch in sorted(self.total.weapons.items()):
+            if sketch.n == 0:
+                continue
+            weapon = self.weapons[idx] if idx < len(self.weapons) else None
+            weapons.append({
+                "weapon": idx,
+                "name": weapon.name if weapon else str(idx),
+                "uses": sketch.n,
+                "mean": sketch.mean,
+                "expected": weapon.avg_damage if weapon else None,
+                "variance": sketch.variance,
+                "expected_variance": weapon.variance if weapon else None,
+                "crit_rate": sketch.crit_rate,
+                "p10": sketch.quantile(0.10),
+                "median": sketch.quantile(0.50),
+                "p90": sketch.quantile(0.90),
+                "histogram": sketch.histogram(),
+            })
+        return {"reports": self.reports, "attacks": self.total.n, "weapons": weapons}
+
+
+if __name__ == "__main__":
+    import random
+    from weapons import WEAPONS
+
+    print("🧮 TESTANDO RESUMOS MESCLÁVEIS\n")
+
+    rng = random.Random(3)
+    collector = StatsCollector(WEAPONS)
+    all_damages = {idx: [] for idx in range(len(WEAPONS))}
+    for _ in range(200):  # 200 "alunos"
+        session = SessionSketch(WEAPONS)
+        for _ in range(rng.randint(10, 300)):
+            idx = rng.randrange(len(WEAPONS))
+            damage, is_crit = WEAPONS[idx].roll(rng)
+            session.update(idx, damage, is_crit)
+            all_damages[idx].append(damage)
+        collector.merge(session.to_dict())
+
+    for entry in collector.snapshot()["weapons"]:
+        raw = np.array(all_damages[entry["weapon"]])
+        assert entry["uses"] == len(raw)
+        assert abs(entry["mean"] - raw.mean()) < 1e-9
+        assert abs(entry["variance"] - raw.var(ddof=1)) < 1e-6
+        assert entry["median"] == int(np.quantile(raw, 0.5, method="inverted_cdf"))
+        print(f"{entry['name']:<20} usos={entry['uses']:<6} media={entry['mean']:6.2f} "
+              f"(esperado {entry['expected']:5.2f}) var={entry['variance']:7.2f} "
+              f"crit={entry['crit_rate'] * 100:5.2f}% mediana={entry['median']}")
+
+    # Resumos inválidos vindos da rede são recusados sem tocar no total
+    before = collector.total.n
+    for bad in ([], {"0": {"offset": 10**12, "counts": [1]}}, {"99": {"offset": 1, "counts": [1]}},
+                {"0": {"offset": 1, "counts": [-1]}}, {"0": {"offset": 1, "counts": [1], "crits": 2}}):
+        try:
+            collector.merge(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f"resumo invalido aceito: {bad}")
+    assert collector.total.n == before
+
+    print("\n✅ Módulo funcionando corretamente!")
@@ -0,0 +1,364 @@
+import hashlib
+import os
+import queue
+import struct
+import threading
+import time
+from itertools import islice
+
+import numpy as np
+
+from gof import GoodnessOfFit
+from sketches import DamageSketch, SessionSketch
+
+
+MAGIC = b"FGSN"
+SNAPSHOT_VERSION = 4
+HISTORY_TAIL = 2000  # ataques salvos de um histórico sem limite
+_HEADER = struct.Struct("<4sH16s")
+_ARRAY = struct.Struct("<cQ")  # tipo ('q' int64, 'd' float64, 'I' uint32) e tamanho
+_DTYPES = {b"q": np.int64, b"d": np.float64, b"I": np.uint32}
+
+
+class SnapshotError(ValueError):
+    """Snapshot inválido, de outra versão ou de outras definições de jogo"""
+
+
+def definitions_key(session):
+    """Hash das armas e monstros: um snapshot só é restaurado no mesmo jogo"""
+    digest = hashlib.sha256()
+    for w in session.weapons:
+        digest.update(f"W{w.name}|{w.dice_notation}|".encode())
+    for m in session.monster_templates:
+        digest.update(f"M{m.name}|{m.max_hp}|{m.dice_notation}|{m.is_boss}|".encode())
+    return digest.hexdigest()[:16].encode()
+
+
+_CODES = {np.dtype(np.int64): b"q", np.dtype(np.float64): b"d", np.dtype(np.uint32): b"I"}
+
+
+def _pack(parts, array):
+    array = np.ascontiguousarray(array)
+    parts.append(_ARRAY.pack(_CODES[array.dtype], len(array)))
+    parts.append(array.tobytes())
+
+
+class _Reader:
+    def __init__(self, data):
+        self.view = memoryview(data)
+        self.position = 0
+
+    def array(self):
+        try:
+            code, length = _ARRAY.unpack_from(self.view, self.position)
+            dtype = np.dtype(_DTYPES[code])
+        except (struct.error, KeyError) as exc:
+            raise SnapshotError(f"Snapshot corrompido: {exc}") from exc
+        self.position += _ARRAY.size
+        end = self.position + length * dtype.itemsize
+        if end > len(self.view):
+            raise SnapshotError("Snapshot truncado")
+        array = np.frombuffer(self.view[self.position:end], dtype=dtype)
+        self.position = end
+        return array
+
+
+def dumps(session):
+    """Serializa o estado da sessão em bytes (formato binário versionado)
+
+    Inclui HP, sala, monstros (HP e turn_count), o estado do gerador
+    aleatório, as contagens por arma, os ataques mais recentes do histórico
+    e as séries decimadas dos gráficos (`session.plots`, se houver) - só
+    estado limitado, então o tamanho do snapshot não cresce com o número de
+    ataques. Eventos pendentes são entregues antes, para que as
+    estatísticas estejam completas.
+    """
+    return b"".join(_parts(session))
+
+
+def _parts(session):
+    session.events.flush()
+    parts = [_HEADER.pack(MAGIC, SNAPSHOT_VERSION, definitions_key(session))]
+
+    last_weapon = -1 if session.last_weapon_used is None else session.weapons.index(session.last_weapon_used)
+    player_damage, player_crit = session.last_player_damage or (-1, False)
+    monster_damage, monster_special = session.last_monster_damage or (-1, False)
+    _pack(parts, np.array([
+        session.player_hp, session.max_hp, session.current_room, session.turn,
+        session.game_over, session.victory,
+        session.total_attacks, session.total_damage, session.critical_hits,
+        last_weapon, player_damage, player_crit, monster_damage, monster_special,
+        -1 if session.history_limit is None else session.history_limit,
+        session.current_monster is not None,
+    ], dtype=np.int64))
+    _pack(parts, np.array([(m.current_hp, m.turn_count) for m in session.monsters], dtype=np.int64).ravel())
+
+    version, internal, gauss_next = session.rng.getstate()
+    _pack(parts, np.array(internal, dtype=np.uint32))
+    _pack(parts, np.array([version, gauss_next is not None], dtype=np.int64))
+    _pack(parts, np.array([gauss_next or 0.0]))
+
+    # Contagens, arma por arma (mesma ordem de session.weapons); somas e
+    # momentos são recalculados a partir delas na leitura
+    for idx in range(len(session.weapons)):
+        sketch = session.sketch.weapons[idx]
+        _pack(parts, session.fits[idx].counts)
+        _pack(parts, np.array([sketch.offset, sketch.crits], dtype=np.int64))
+        _pack(parts, sketch.counts)
+
+    history = session.damage_history
+    keep = min(len(history), HISTORY_TAIL if session.history_limit is None else session.history_limit)
+    start = len(history) - keep
+    tail = history[start:] if isinstance(history, list) else islice(history, start, None)
+    _pack(parts, np.fromiter(tail, dtype=np.int64, count=keep))
+
+    plots = getattr(session, "plots", ())
+    _pack(parts, np.array([len(plots)], dtype=np.int64))
+    for plot in plots:
+        b = plot.buckets
+        _pack(parts, np.array([plot.bucket_size, b, plot.fill, plot.n], dtype=np.int64))
+        _pack(parts, np.concatenate((plot.min_x[:b], plot.max_x[:b])))
+        _pack(parts, np.concatenate((plot.min_y[:b], plot.max_y[:b])))
+    return parts
+
+
+def loads(session, data):
+    """Restaura em `session` um estado serializado por `dumps`"""
+    try:
+        magic, version, key = _HEADER.unpack_from(data, 0)
+    except struct.error as exc:
+        raise SnapshotError("Snapshot truncado") from exc
+    if magic != MAGIC:
+        raise SnapshotError("Arquivo nao e um snapshot do Fate's Gambit")
+    if version != SNAPSHOT_VERSION:
+        raise SnapshotError(f"Versao de snapshot nao suportada: {version}")
+    if key != definitions_key(session):
+        raise SnapshotError("Snapshot de outras definicoes de armas/monstros")
+    reader = _Reader(data)
+    reader.position = _HEADER.size
+
+    (player_hp, max_hp, room, turn, game_over, victory, total_attacks, total_damage, critical_hits,
+     last_weapon, player_damage, player_crit, monster_damage, monster_special,
+     history_limit, has_monster) = reader.array().tolist()
+    monsters = reader.array().reshape(-1, 2).tolist()
+    internal = tuple(reader.array().tolist())
+    rng_version, has_gauss = reader.array().tolist()
+    gauss = float(reader.array()[0])
+    gauss_next = gauss if has_gauss else None
+
+    session.events.pending_attacks.clear()
+    session.events.pending_rooms.clear()
+    session.history_limit = None if history_limit < 0 else history_limit
+    session.reset()
+    session.events.pending_rooms.clear()  # o "enter" da sala 1 não faz parte do estado salvo
+
+    session.max_hp = max_hp
+    session.player_hp = player_hp
+    session.current_room = room
+    session.turn = turn
+    session.game_over = bool(game_over)
+    session.victory = bool(victory)
+    session.total_attacks = total_attacks
+    session.total_damage = total_damage
+    session.critical_hits = critical_hits
+    session.last_weapon_used = None if last_weapon < 0 else session.weapons[last_weapon]
+    session.last_player_damage = None if player_damage < 0 else (player_damage, bool(player_crit))
+    session.last_monster_damage = None if monster_damage < 0 else (monster_damage, bool(monster_special))
+    for monster, (hp, turn_count) in zip(session.monsters, monsters):
+        monster.current_hp = hp
+        monster.turn_count = turn_count
+    # Após a vitória a sala passa do fim, mas o monstro atual continua sendo o chefe
+    session.current_monster = session.monsters[min(room, len(session.monsters) - 1)] if has_monster else None
+    session.rng.setstate((rng_version, internal, gauss_next))
+
+    for idx, weapon in enumerate(session.weapons):
+        session.fits[idx] = GoodnessOfFit.from_counts(weapon.pmf, weapon.min_damage, reader.array())
+        offset, crits = reader.array().tolist()
+        session.sketch.weapons[idx] = DamageSketch.from_counts(offset, reader.array().copy(), crits)
+    session.damage_history.extend(reader.array().tolist())
+
+    plots = getattr(session, "plots", ())
+    (count,) = reader.array().tolist()
+    for i in range(count):
+        bucket_size, b, fill, n = reader.array().tolist()
+        xs, ys = reader.array(), reader.array()
+        if i >= len(plots):
+            continue  # gráficos de um jogo com janela, restaurados numa sessão sem eles
+        plot = plots[i]
+        if b > len(plot.min_x) or len(xs) != 2 * b or len(ys) != 2 * b:
+            raise SnapshotError("Serie decimada incompativel")
+        plot.bucket_size, plot.buckets, plot.fill, plot.n = bucket_size, b, fill, n
+        plot.min_x[:b], plot.max_x[:b] = xs[:b], xs[b:]
+        plot.min_y[:b], plot.max_y[:b] = ys[:b], ys[b:]
+    return session
+
+
+def save(session, path):
+    """Grava o snapshot de forma atômica (arquivo temporário + rename)"""
+    write_parts(_parts(session), path)
+
+
+def write_parts(parts, path):
+    data = b"".join(parts)  # uma única escrita (libera o GIL durante o I/O)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def load(session, path):
+    with open(path, "rb") as f:
+        return loads(session, f.read())
+
+
+class BackgroundSaver:
+    """Salvamento periódico sem travar o quadro
+
+    `tick()` é chamado a cada quadro: quando o intervalo vence, monta o
+    snapshot (menos de 1 ms, já que só há estado limitado) e entrega os bytes
+    a uma thread que faz a escrita em disco. Se a escrita anterior ainda não
+    terminou, só o snapshot mais recente fica na fila.
+    """
+
+    def __init__(self, session, path, interval=10.0, log=print):
+        self.session = session
+        self.path = path
+        self.interval = interval
+        self.log = log
+        self.last_save = time.monotonic()
+        self.queue = queue.Queue(maxsize=1)
+        self.thread = threading.Thread(target=self._writer, daemon=True)
+        self.thread.start()
+
+    def _writer(self):
+        while True:
+            parts = self.queue.get()
+            try:
+                if parts is None:
+                    return
+                write_parts(parts, self.path)
+            except OSError as exc:
+                self.log(f"[snapshot] Falha ao salvar {self.path}: {exc}")
+            finally:
+                self.queue.task_done()
+
+    def save_now(self):
+        parts = _parts(self.session)
+        try:
+            self.queue.get_nowait()  # descarta o snapshot antigo ainda não escrito
+            self.queue.task_done()
+        except queue.Empty:
+            pass
+        self.queue.put_nowait(parts)
+        self.last_save = time.monotonic()
+
+    def tick(self):
+        if self.interval and time.monotonic() - self.last_save >= self.interval:
+            self.save_now()
+
+    def close(self):
+        """Espera a última escrita pendente e encerra a thread"""
+        self.queue.join()
+        self.queue.put(None)
+        self.thread.join()
+
+
+if __name__ == "__main__":
+    import math
+    import tempfile
+    from session import GameSession
+
+    def same_stats(a, b):
+        """As somas dos testes são recalculadas das contagens: p-valores iguais até o arredondamento"""
+        def close(x, y):
+            if isinstance(x, float):
+                return math.isclose(x, y, rel_tol=1e-9, abs_tol=1e-12)
+            if isinstance(x, list):
+                return len(x) == len(y) and all(same_stats(u, v) for u, v in zip(x, y))
+            return x == y
+        return a.keys() == b.keys() and all(close(a[k], b[k]) for k in a)
+
+    print("💾 TESTANDO SNAPSHOTS\n")
+
+    session = GameSession(seed=11)
+    for _ in range(1000):
+        session.attack()
+        if session.is_finished():
+            session.new_run()
+    for _ in range(3):
+        session.attack()
+    session.events.flush()
+
+    start = time.perf_counter()
+    data = dumps(session)
+    dump_ms = (time.perf_counter() - start) * 1000
+    restored = GameSession(seed=999)
+    start = time.perf_counter()
+    loads(restored, data)
+    load_ms = (time.perf_counter() - start) * 1000
+    print(f"Snapshot: {len(data)} bytes, escrita {dump_ms:.3f} ms, leitura {load_ms:.3f} ms")
+
+    assert restored.state() == session.state()
+    assert same_stats(restored.stats(), session.stats())
+    assert dumps(restored) == data
+
+    # Rolagens futuras idênticas, bit a bit
+    for _ in range(500):
+        a, b = session.attack(), restored.attack()
+        assert a == b and session.state() == restored.state()
+        if session.is_finished():
+            session.new_run()
+            restored.new_run()
+    assert dumps(restored) == dumps(session)
+    print("Continuacao identica apos restaurar: OK")
+
+    # Telas de fim de jogo: vitória (monstro atual = chefe morto) e derrota
+    for finished, condition in ((GameSession(seed=5, max_hp=1000), "victory"),
+                                (GameSession(seed=5, max_hp=10), "game_over")):
+        while not finished.is_finished():
+            finished.attack()
+        assert getattr(finished, condition)
+        copy = loads(GameSession(), dumps(finished))
+        assert copy.state() == finished.state() and same_stats(copy.stats(), finished.stats())
+    print("Vitoria e derrota restauradas: OK")
+
+    path = os.path.join(tempfile.mkdtemp(), "autosave.snap")
+    saver = BackgroundSaver(session, path, interval=0.01)
+    for _ in range(20):
+        session.attack()
+        if session.is_finished():
+            session.new_run()
+        time.sleep(0.002)
+        saver.tick()
+    saver.save_now()
+    saver.close()
+    assert load(GameSession(), path).state() == session.state()
+    print("Salvamento em segundo plano: OK")
+
+    # Sessão longa (modo turbo): o custo por quadro não cresce com o histórico
+    saver = BackgroundSaver(session, path, interval=None)
+    worst = 0.0
+    for frame in range(150):
+        for _ in range(2000):
+            session.attack()
+            if session.is_finished():
+                session.new_run()
+        session.events.flush()
+        saver.tick()
+        if frame % 30 == 29:
+            start = time.perf_counter()
+            _parts(session)  # o que roda no quadro; o disco fica com a thread
+            worst = max(worst, time.perf_counter() - start)
+            saver.save_now()
+    saver.close()
+    assert same_stats(load(GameSession(), path).stats(), session.stats())
+    size = len(dumps(session))
+    assert size < len(data) + 8 * HISTORY_TAIL  # só a cauda do histórico, nunca a série inteira
+    print(f"{session.total_attacks} ataques: snapshot de {size} bytes, montado em ate {worst * 1000:.3f} ms")
+
+    try:
+        loads(GameSession(), b"XXXX" + data[4:])
+    except SnapshotError as exc:
+        print(f"Arquivo invalido rejeitado: {exc}")
+
+    print("\n✅ Módulo funcionando corretamente!")
@@ -0,0 +1,180 @@
+import hashlib
+import os
+
+import numpy as np
+
+from content import DATA_DIR
+
+
+TTK_VERSION = 2
+RANDOM_WEAPON = -1  # linha da arma sorteada uniformemente (modo normal)
+TAIL_TOLERANCE = 1e-12
+MAX_HITS = 100_000  # limite para armas que quase nunca causam dano
+
+
+def _weapon_pmf(weapon):
+    """Distribuição de dano indexada a partir de 0"""
+    pmf = np.zeros(weapon.max_damage + 1)
+    pmf[weapon.min_damage:] = weapon.pmf
+    return pmf
+
+
+def _mixture_pmf(weapons):
+    pmfs = [_weapon_pmf(w) for w in weapons]
+    mixture = np.zeros(max(len(p) for p in pmfs))
+    for pmf in pmfs:
+        mixture[:len(pmf)] += pmf / len(pmfs)
+    return mixture
+
+
+def definitions_key(weapons, monsters):
+    """Hash das definições que influenciam a matriz (invalida o cache)"""
+    digest = hashlib.sha256(f"v{TTK_VERSION}".encode())
+    for w in weapons:
+        digest.update(f"W{w.min_damage}|".encode())
+        digest.update(np.asarray(w.pmf, dtype=float).tobytes())
+    digest.update(f"M{[m.max_hp for m in monsters]}".encode())
+    return digest.hexdigest()[:16]
+
+
+def kill_cdf(pmf, hp, max_hits=MAX_HITS):
+    """P(matar em até k golpes) para k = 0, 1, ... por potências de convolução
+
+    `alive[h]` é a probabilidade de ter causado exatamente h de dano sem
+    ainda matar (h < hp). Cada golpe convolui com a PMF da arma e descarta a
+    massa que passou de `hp - 1`, que é exatamente a que matou nesse golpe.
+    O horizonte vai até a sobrevivência ficar abaixo de `TAIL_TOLERANCE` -
+    com dano 0 possível (ex.: "1d4-2") podem ser necessários mais de `hp`
+    golpes.
+    """
+    alive = np.zeros(hp)
+    alive[0] = 1.0
+    cdf = [0.0]
+    for _ in range(max_hits):
+        alive = np.convolve(alive, pmf)[:hp]
+        survival = alive.sum()
+        cdf.append(max(0.0, 1.0 - survival))
+        if survival < TAIL_TOLERANCE:
+            break
+    return np.array(cdf)
+
+
+def expected_hits(pmf, max_hp):
+    """E[golpes para matar] para cada HP restante 0..max_hp (renovação)
+
+    E[h] = 1 + sum_d p(d) E[h - d], com E[h <= 0] = 0; dano 0 apenas
+    repete o golpe, daí a divisão por 1 - p(0).
+    """
+    expected = np.zeros(max_hp + 1)
+    stay = pmf[0]
+    for h in range(1, max_hp + 1):
+        d = np.arange(1, min(len(pmf), h + 1))
+        expected[h] = (1.0 + np.dot(pmf[d], expected[h - d])) / (1.0 - stay)
+    return expected
+
+
+class TimeToKill:
+    """Matriz arma x monstro de golpes para matar, pré-calculada
+
+    `expected[w, h]` é o número esperado de golpes da arma w para tirar h
+    de HP (a última linha, `RANDOM_WEAPON`, é a arma sorteada a cada golpe).
+    `cdf[w, m, k]` é P(matar o monstro m em até k golpes). Tudo é consulta
+    em tabela: o jogo pode mostrar os golpes restantes a cada quadro.
+    """
+
+    def __init__(self, expected, cdf):
+        self.expected = expected
+        self.cdf = cdf
+
+    def expected_hits(self, weapon_idx, hp):
+        """Golpes esperados para tirar `hp` de vida (arma None = sorteada)"""
+        row = RANDOM_WEAPON if weapon_idx is None else weapon_idx
+        return float(self.expected[row, min(max(hp, 0), self.expected.shape[1] - 1)])
+
+    def kill_within(self, weapon_idx, monster_idx, hits):
+        """P(matar o monstro com vida cheia em até `hits` golpes)"""
+        row = RANDOM_WEAPON if weapon_idx is None else weapon_idx
+        return float(self.cdf[row, monster_idx, min(hits, self.cdf.shape[2] - 1)])
+
+    def hits_pmf(self, weapon_idx, monster_idx):
+        """Distribuição do número de golpes para matar (índice = golpes)"""
+        row = RANDOM_WEAPON if weapon_idx is None else weapon_idx
+        return np.diff(self.cdf[row, monster_idx], prepend=0.0)
+
+    @classmethod
+    def compute(cls, weapons, monsters):
+        pmfs = [_weapon_pmf(w) for w in weapons] + [_mixture_pmf(weapons)]
+        max_mhp = max(m.max_hp for m in monsters)
+        expected = np.array([expected_hits(pmf, max_mhp) for pmf in pmfs])
+        # Cada CDF tem o próprio horizonte; as mais curtas são completadas com o último valor
+        rows = [[kill_cdf(pmf, m.max_hp) for m in monsters] for pmf in pmfs]
+        horizon = max(len(row) for pmf_rows in rows for row in pmf_rows)
+        cdf = np.ones((len(pmfs), len(monsters), horizon))
+        for w, pmf_rows in enumerate(rows):
+            for m, row in enumerate(pmf_rows):
+                cdf[w, m, :len(row)] = row
+                cdf[w, m, len(row):] = row[-1]
+        return cls(expected, cdf)
+
+    @classmethod
+    def load(cls, weapons, monsters, directory=DATA_DIR):
+        """Carrega a matriz do cache em disco ou a calcula e salva"""
+        path = os.path.join(directory, f"ttk-{definitions_key(weapons, monsters)}.npz")
+        try:
+            with np.load(path) as data:
+                return cls(data["expected"], data["cdf"])
+        except (OSError, ValueError, KeyError):
+            pass
+
+        table = cls.compute(weapons, monsters)
+        try:
+            tmp_path = path + ".tmp.npz"
+            np.savez(tmp_path, expected=table.expected, cdf=table.cdf)
+            os.replace(tmp_path, path)
+        except OSError:
+            pass  # diretório somente leitura: segue sem cache
+        return table
+
+
+if __name__ == "__main__":
+    import time
+    from monsters import MONSTERS
+    from weapons import WEAPONS
+
+    print("⏱️  TESTANDO MATRIZ DE GOLPES PARA MATAR\n")
+
+    start = time.perf_counter()
+    table = TimeToKill.compute(WEAPONS, MONSTERS)
+    print(f"Matriz calculada em {(time.perf_counter() - start) * 1000:.1f}ms "
+          f"({table.cdf.nbytes / 1024:.0f} KB)")
+
+    # Confere E[golpes] da matriz com a média da distribuição de golpes
+    for w in range(len(WEAPONS)):
+        for m, monster in enumerate(MONSTERS):
+            pmf = table.hits_pmf(w, m)
+            mean = float(np.dot(np.arange(len(pmf)), pmf))
+            assert abs(mean - table.expected_hits(w, monster.max_hp)) < 1e-6, (w, m)
+
+    # Confere por simulação: Espada contra o Dragao
+    rng = np.random.default_rng(1)
+    weapon, monster = WEAPONS[1], MONSTERS[-1]
+    rolls, _ = weapon.roll_many(200_000 * 60, rng)
+    rolls = rolls.reshape(200_000, 60)
+    hits = np.argmax(np.cumsum(rolls, axis=1) >= monster.max_hp, axis=1) + 1
+    print(f"{weapon.name} x {monster.name}: E[golpes] exato={table.expected_hits(1, monster.max_hp):.3f} "
+          f"simulado={hits.mean():.3f}")
+    print(f"  P(matar em ate 20 golpes) exato={table.kill_within(1, len(MONSTERS) - 1, 20):.4f} "
+          f"simulado={(hits <= 20).mean():.4f}")
+
+    # Arma com dano 0 possível: o horizonte passa do HP do monstro
+    from weapons import Weapon
+    weak = [Weapon("Graveto", "1d4-2")]
+    table = TimeToKill.compute(weak, MONSTERS[:1])
+    pmf = table.hits_pmf(0, 0)
+    mean = float(np.dot(np.arange(len(pmf)), pmf))
+    assert len(pmf) > MONSTERS[0].max_hp + 1 and abs(pmf.sum() - 1.0) < 1e-9
+    assert abs(mean - table.expected_hits(0, MONSTERS[0].max_hp)) < 1e-6
+    print(f"{weak[0].name} (1d4-2) x {MONSTERS[0].name}: E[golpes]={mean:.3f} "
+          f"(horizonte de {len(pmf) - 1} golpes)")
+
+    print("\n✅ Módulo funcionando corretamente!")
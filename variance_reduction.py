@@ -0,0 +1,173 @@
+import math
+
+import numpy as np
+
+from simulation import run_batch
+
+
+def seeded_uniforms(seed, n):
+    """Uniformes reproduzíveis por passo: o bloco do passo k depende só de (seed, k)
+
+    Duas variantes simuladas com a mesma fonte consomem exatamente os mesmos
+    números em cada partida e turno (números aleatórios comuns), mesmo que
+    as partidas terminem em momentos diferentes.
+    """
+    return lambda step: np.random.default_rng((seed, step)).random((3, n))
+
+
+def antithetic_uniforms(source):
+    """Dobra a fonte: a partida i e a i + n/2 formam um par antitético
+
+    Todos os uniformes são espelhados (1 - u): como os sorteios são por
+    inversão da CDF (e a escolha de arma segue a ordem do dano médio), uma
+    arma forte com dado alto numa partida vira uma arma fraca com dado baixo
+    na outra, e o mesmo vale para os contra-ataques.
+    """
+    def uniforms(step):
+        u = source(step)
+        return np.concatenate((u, 1.0 - u), axis=1)
+    return uniforms
+
+
+def victory_rate(result):
+    return result.victory.astype(float)
+
+
+def rooms_cleared(result):
+    return result.rooms_cleared.astype(float)
+
+
+def attack_count(result):
+    return result.attacks.astype(float)
+
+
+def control_adjust(values, controls):
+    """Variáveis de controle com média conhecida 0: Y - beta . C
+
+    `beta` é o coeficiente de regressão de Y em C estimado na própria
+    amostra. Retorna (valores ajustados, beta).
+    """
+    controls = np.column_stack(controls)
+    centered = controls - controls.mean(axis=0)
+    beta, *_ = np.linalg.lstsq(centered, values - values.mean(), rcond=None)
+    return values - controls @ beta, beta
+
+
+def _std_error(samples):
+    return math.sqrt(samples.var(ddof=1) / len(samples)) if len(samples) > 1 else math.inf
+
+
+class VarianceReport:
+    """Estimativa com o erro padrão do método e o do Monte Carlo comum equivalente
+
+    `reduction` = variância ingênua / variância do método, ou seja, quantas
+    vezes mais partidas o Monte Carlo comum precisaria para a mesma precisão.
+    """
+
+    def __init__(self, mode, estimate, std_error, naive_std_error, n):
+        self.mode = mode
+        self.estimate = estimate
+        self.std_error = std_error
+        self.naive_std_error = naive_std_error
+        self.n = n
+
+    @property
+    def reduction(self):
+        if self.std_error == 0:
+            return math.inf
+        return (self.naive_std_error / self.std_error) ** 2
+
+    def to_dict(self):
+        return {
+            "mode": self.mode,
+            "estimate": self.estimate,
+            "std_error": self.std_error,
+            "naive_std_error": self.naive_std_error,
+            "reduction": self.reduction,
+            "n": self.n,
+        }
+
+    def __str__(self):
+        return (f"{self.mode:<22} {self.estimate:+.5f} ± {self.std_error:.5f} "
+                f"(ingenuo ± {self.naive_std_error:.5f}, reducao {self.reduction:5.1f}x, n={self.n})")
+
+
+def estimate(model, n, metric=victory_rate, antithetic=False, control=False, seed=0, **start):
+    """E[metric] de um modelo, com variáveis antitéticas e/ou de controle
+
+    Com `antithetic` as `n` partidas formam n/2 pares (u, 1 - u); com
+    `control` a métrica é ajustada pelos desvios de dano em relação às
+    médias conhecidas (`Weapon.avg_damage` e as do monstro).
+    """
+    half = n // 2 if antithetic else n
+    uniforms = seeded_uniforms(seed, half)
+    if antithetic:
+        uniforms = antithetic_uniforms(uniforms)
+    result = run_batch(model, 2 * half if antithetic else n, uniforms, **start)
+    values = metric(result)
+    naive_std_error = _std_error(values)
+    if control:
+        values, _ = control_adjust(values, (result.player_luck, result.monster_luck))
+    samples = (values[:half] + values[half:]) / 2 if antithetic else values
+
+    mode = "+".join(name for name, on in (("antitetico", antithetic), ("controle", control)) if on) or "simples"
+    return VarianceReport(mode, float(samples.mean()), _std_error(samples), naive_std_error, len(values))
+
+
+def compare_variants(model_a, model_b, n, metric=victory_rate, common=True, control=False, seed=0, **start):
+    """Diferença E[metric | B] - E[metric | A] entre duas variantes de balanceamento
+
+    Com `common` as duas variantes usam os mesmos números aleatórios por
+    partida e turno e a diferença é estimada partida a partida; a redução
+    é medida contra variantes simuladas de forma independente (soma das
+    variâncias).
+    """
+    if common:
+        runs = [run_batch(model, n, seeded_uniforms(seed, n), **start) for model in (model_a, model_b)]
+    else:
+        runs = [run_batch(model, n, seeded_uniforms(seed + i, n), **start)
+                for i, model in enumerate((model_a, model_b))]
+    values = [metric(result) for result in runs]
+    naive_std_error = math.sqrt(_std_error(values[0]) ** 2 + _std_error(values[1]) ** 2)
+
+    if control:
+        values = [control_adjust(v, (r.player_luck, r.monster_luck))[0] for v, r in zip(values, runs)]
+    if common:
+        std_error = _std_error(values[1] - values[0])
+    else:
+        std_error = math.sqrt(_std_error(values[0]) ** 2 + _std_error(values[1]) ** 2)
+
+    mode = "+".join(name for name, on in (("comuns", common), ("controle", control)) if on) or "independente"
+    return VarianceReport(mode, float(values[1].mean() - values[0].mean()), std_error, naive_std_error, 2 * n)
+
+
+if __name__ == "__main__":
+    import time
+    from monsters import MONSTERS
+    from simulation import CombatModel
+    from weapons import WEAPONS
+
+    print("📉 TESTANDO REDUÇÃO DE VARIÂNCIA\n")
+
+    base = CombatModel(WEAPONS, MONSTERS)
+    n = 200_000
+
+    for label, metric in (("Salas vencidas por partida", rooms_cleared), ("Ataques por partida", attack_count)):
+        print(f"{label} (media):")
+        for antithetic, control in ((False, False), (True, False), (False, True), (True, True)):
+            t0 = time.perf_counter()
+            report = estimate(base, n, metric, antithetic=antithetic, control=control, seed=1)
+            print(f"  {report}  {time.perf_counter() - t0:.2f}s")
+        print()
+
+    # Variante de balanceamento: Dragao com 140 HP em vez de 150
+    hp = base.monster_hp.copy()
+    hp[-1] -= 10
+    variant = base.variant(monster_hp=hp)
+    print("Efeito do Dragao com 140 HP na taxa de vitoria (vencer o chefe com 20 HP):")
+    start = dict(start_room=5, player_hp=20)
+    for common, control in ((False, False), (True, False), (True, True)):
+        report = compare_variants(base, variant, n, victory_rate, common=common, control=control, seed=2, **start)
+        print(f"  {report}")
+
+    print("\n✅ Módulo funcionando corretamente!")
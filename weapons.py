@@ -1,48 +1,52 @@
 import random
+from functools import cached_property
+
 import numpy as np
 
+from alias import AliasTable
+from content import WEAPONS_FILE, build_dice, compile_dice, load_compiled
+
 
 class Weapon:
     """Representa uma arma no jogo"""
     
-    def __init__(self, name, dice_notation, num_dice, sides):
+    def __init__(self, name, dice_notation, num_dice=None, sides=None, compiled=None):
+        if compiled is None:
+            compiled = compile_dice(dice_notation)
+        
         self.name = name
         self.dice_notation = dice_notation
-        self.num_dice = num_dice
-        self.sides = sides
+        self.dice = build_dice(compiled)
+        self.num_dice = compiled["num_dice"] if num_dice is None else num_dice
+        self.sides = compiled["sides"] if sides is None else sides
         
-        self.min_damage = num_dice
-        self.max_damage = num_dice * sides
-        self.avg_damage = num_dice * (sides + 1) / 2
-        self.variance = num_dice * (sides ** 2 - 1) / 12
+        self.min_damage = compiled["min"]
+        self.max_damage = compiled["max"]
+        self.avg_damage = compiled["avg"]
+        self.variance = compiled["variance"]
         self.std_dev = np.sqrt(self.variance)
-        
-        if num_dice == 1:
-            self.critical_prob = 1.0 / sides
-        else:
-            self.critical_prob = (1.0 / sides) ** num_dice
+        self.pmf = compiled["pmf"]
+        self.critical_prob = compiled["crit_prob"]
+    
+    @cached_property
+    def alias_table(self):
+        """Tabela alias da distribuição de dano (montada uma vez por arma)"""
+        return AliasTable(self.pmf, self.min_damage)
     
-    def roll(self):
-        """Rola os dados e retorna o dano"""
-        total = sum(random.randint(1, self.sides) for _ in range(self.num_dice))
+    def roll(self, rng=random):
+        """Rola os dados e retorna o dano (O(1), qualquer que seja a expressão)"""
+        total = self.alias_table.sample(rng)
         is_critical = (total == self.max_damage)
         return total, is_critical
     
+    def roll_many(self, size, rng=None):
+        """Rola os dados `size` vezes de forma vetorizada"""
+        totals = self.alias_table.sample_many(size, rng)
+        return totals, totals == self.max_damage
+    
     def get_theoretical_distribution(self):
-        """Retorna a distribuição teórica de probabilidades"""
-        if self.num_dice == 1:
-            probs = {i: 1.0 / self.sides for i in range(self.min_damage, self.max_damage + 1)}
-        else:
-            probs = {}
-            for val in range(self.min_damage, self.max_damage + 1):
-                z = (val - self.avg_damage) / self.std_dev
-                prob = np.exp(-0.5 * z ** 2) / (self.std_dev * np.sqrt(2 * np.pi))
-                probs[val] = prob
-            
-            total = sum(probs.values())
-            probs = {k: v / total for k, v in probs.items()}
-        
-        return probs
+        """Retorna a distribuição teórica (exata) de probabilidades"""
+        return self.dice.probabilities()
     
     def get_info(self):
         """Retorna informações formatadas da arma"""
@@ -60,51 +64,18 @@ class Weapon:
         return f"{self.name} ({self.dice_notation}) - Avg: {self.avg_damage:.1f}"
 
 
+def _compile_weapon(raw):
+    """Converte uma entrada do arquivo de dados em dados pré-calculados"""
+    return {"name": raw["name"], "dice": raw["dice"], **compile_dice(raw["dice"])}
+
+
+def load_weapons(path=WEAPONS_FILE):
+    """Carrega as armas de um arquivo JSON/TOML (com cache pré-compilado)"""
+    return [Weapon(entry["name"], entry["dice"], compiled=entry)
+            for entry in load_compiled(path, "weapons", _compile_weapon)]
 
-WEAPONS = [
-    Weapon(
-        name="Adaga Rapida",
-        dice_notation="1d6",
-        num_dice=1,
-        sides=6
-    ),
-    Weapon(
-        name="Espada Comum",
-        dice_notation="2d6",
-        num_dice=2,
-        sides=6
-    ),
-    Weapon(
-        name="Martelo Pesado",
-        dice_notation="3d4",
-        num_dice=3,
-        sides=4
-    ),
-    Weapon(
-        name="Arco Longo",
-        dice_notation="1d12",
-        num_dice=1,
-        sides=12
-    ),
-    Weapon(
-        name="Cajado Magico",
-        dice_notation="4d3",
-        num_dice=4,
-        sides=3
-    ),
-    Weapon(
-        name="Critico Lendario",
-        dice_notation="1d20",
-        num_dice=1,
-        sides=20
-    ),
-    Weapon(
-        name="d100 do Caos",
-        dice_notation="1d100",
-        num_dice=1,
-        sides=100
-    ),
-]
+
+WEAPONS = load_weapons()
 
 
 def get_weapon(index):
@@ -134,6 +105,19 @@ def compare_weapons():
               f"{info['std']:<6.2f} {info['crit_prob']:<6.2f}")
     
     print("=" * 70)
+    
+    # Golpes esperados para matar cada monstro (matriz pré-calculada em cache)
+    from monsters import MONSTERS
+    from time_to_kill import TimeToKill
+    table = TimeToKill.load(WEAPONS, MONSTERS)
+    header = "".join(f"{m.name.split()[0][:9]:>10}" for m in MONSTERS)
+    print("\nGOLPES ESPERADOS PARA MATAR (P de matar o chefe em ate 20 golpes)")
+    print(f"{'Arma':<20}{header}{'P(<=20)':>10}")
+    print("-" * (30 + 10 * len(MONSTERS)))
+    for i, weapon in enumerate(WEAPONS):
+        row = "".join(f"{table.expected_hits(i, m.max_hp):>10.1f}" for m in MONSTERS)
+        print(f"{weapon.name:<20}{row}{table.kill_within(i, len(MONSTERS) - 1, 20):>10.2%}")
+    print("=" * (30 + 10 * len(MONSTERS)))
 
 
 if __name__ == "__main__":